@@ -0,0 +1,89 @@
+"""
+This is the hints module, it runs the solver in a worker process so the game window stays responsive
+"""
+
+import multiprocessing as mp
+from queue import Empty
+
+from Analysis.solver import Solver
+
+
+def solve_requests(requests: mp.Queue, results: mp.Queue, mode: str, depth: int):
+    """
+    Worker process loop, solves requests until it receives None
+    :param requests: queue of (request id, rows, columns, piece queue, lines)
+    :param results: queue the (request id, points, placements) results are put on
+    :param mode: solver mode
+    :param depth: solver depth
+    """
+    solver = Solver(mode, depth)
+    while True:
+        request = requests.get()
+        # skip to the newest request, older ones are outdated
+        try:
+            while True:
+                request = requests.get_nowait()
+        except Empty:
+            pass
+        if request is None:
+            return
+
+        request_id, rows, solver.columns, queue, lines = request
+        results.put((request_id, *solver.solve(rows, queue, lines)))
+
+
+class HintWorker:
+    """
+    Solver running in a separate process, requests are answered asynchronously
+    """
+    def __init__(self, mode: str = 'score', depth: int = 3):
+        """
+        :param mode: 'perfect' or 'score'
+        :param depth: number of pieces searched
+        """
+        self.requests = mp.Queue()
+        self.results = mp.Queue()
+        self.process = mp.Process(target=solve_requests, args=(self.requests, self.results, mode, depth), daemon=True)
+        self.process.start()
+        self.request_id = 0
+
+    @staticmethod
+    def board_rows(game_area: list[list]) -> tuple[int, ...]:
+        """
+        :param game_area: the game area of a game
+        :return: board as one bitmask per row
+        """
+        return tuple(sum(1 << x for x, block in enumerate(row) if block) for row in game_area)
+
+    def submit(self, game_area: list[list], queue: list[str], lines: int) -> int:
+        """
+        Ask for a hint, replacing any pending request
+        :param game_area: the game area of a game
+        :param queue: shapes of the next pieces, starting with the falling one
+        :param lines: lines cleared so far
+        :return: id of the request
+        """
+        self.request_id += 1
+        self.requests.put((self.request_id, self.board_rows(game_area), len(game_area[0]), list(queue), lines))
+        return self.request_id
+
+    def poll(self):
+        """
+        :return: (request id, points, placements) of the newest result, None if there is no new result
+        """
+        result = None
+        try:
+            while True:
+                result = self.results.get_nowait()
+        except Empty:
+            pass
+        return result
+
+    def close(self):
+        """
+        Stop the worker process
+        """
+        self.requests.put(None)
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.terminate()
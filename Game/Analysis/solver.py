@@ -0,0 +1,264 @@
+"""
+This is the solver module, it searches line clear sequences (perfect clears or best score) for a board and piece queue
+"""
+
+import sys
+from collections import OrderedDict
+
+from settings import COLUMNS, TETROMINOS, SCORE_POINTS
+
+
+def rotations(shape: str) -> list[tuple[tuple[int, int], ...]]:
+    """
+    Calculate the distinct rotations of a tetromino the same way Tetromino.rotate does (90 degrees around block 0)
+    :param shape: shape of the tetromino
+    :return: list of block positions relative to block 0
+    """
+    cells = tuple(TETROMINOS[shape]['shape'])
+    # the square is never rotated in game
+    if shape == 'O':
+        return [cells]
+
+    # rotations are compared after shifting them to the top left, I, S and Z look the same after two turns
+    result = []
+    seen = set()
+    for _ in range(4):
+        min_x = min(x for x, _ in cells)
+        min_y = min(y for _, y in cells)
+        normalised = frozenset((x - min_x, y - min_y) for x, y in cells)
+        if normalised not in seen:
+            seen.add(normalised)
+            result.append(cells)
+        cells = tuple((-y, x) for x, y in cells)
+    return result
+
+
+def placements(rows: tuple[int, ...], shape: str, columns: int = COLUMNS) -> list[tuple[tuple[int, int], ...]]:
+    """
+    Calculate every position a tetromino can be dropped to from above the board
+    :param rows: board as one bitmask per row (bit x set if column x is filled)
+    :param shape: shape of the tetromino
+    :param columns: number of columns of the board
+    :return: list of absolute block positions
+    """
+    result = []
+    for cells in rotations(shape):
+        min_x = min(x for x, _ in cells)
+        max_x = max(x for x, _ in cells)
+        top = min(y for _, y in cells)
+        for dx in range(-min_x, columns - max_x):
+            # start with the lowest block just above the board and drop it until it collides
+            dy = -max(y for _, y in cells) - 1
+            while all(y + dy + 1 < len(rows) and (y + dy + 1 < 0 or not rows[y + dy + 1] >> (x + dx) & 1)
+                      for x, y in cells):
+                dy += 1
+
+            # blocks above the board would end the game
+            if top + dy >= 0:
+                result.append(tuple((x + dx, y + dy) for x, y in cells))
+    return result
+
+
+def place(rows: tuple[int, ...], cells: tuple[tuple[int, int], ...],
+          columns: int = COLUMNS) -> tuple[tuple[int, ...], int]:
+    """
+    Lock a tetromino and clear the full lines
+    :param rows: board as one bitmask per row
+    :param cells: absolute block positions
+    :param columns: number of columns of the board
+    :return: the new board and the number of cleared lines
+    """
+    new_rows = list(rows)
+    for x, y in cells:
+        new_rows[y] |= 1 << x
+
+    full = (1 << columns) - 1
+    kept = [row for row in new_rows if row != full]
+    cleared = len(rows) - len(kept)
+    return tuple([0] * cleared + kept), cleared
+
+
+def holes(rows: tuple[int, ...]) -> int:
+    """
+    :param rows: board as one bitmask per row
+    :return: number of empty cells with a filled cell above them
+    """
+    count = 0
+    covered = 0
+    for row in rows:
+        count += bin(covered & ~row).count('1')
+        covered |= row
+    return count
+
+
+def score(num_lines: int, lines: int) -> int:
+    """
+    Calculate the points for a line clear like Game.calculate_score does
+    :param num_lines: number of lines cleared at once
+    :param lines: number of lines cleared before, used to know the level
+    :return: points
+    """
+    return SCORE_POINTS[num_lines] * (1 + lines // 10) if num_lines else 0
+
+
+class TranspositionTable:
+    """
+    Cache of searched positions with least recently used eviction and a fixed memory budget
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        :param max_bytes: approximate memory the table may use
+        """
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.entries = OrderedDict()
+        self.hits = 0
+
+    @staticmethod
+    def entry_size(key: tuple, value: tuple) -> int:
+        """
+        Objects shared between entries are counted for every entry, so the estimate stays above the real usage
+        :return: approximate memory used by an entry (board, queue, value and placements), including the dict slot
+        """
+        rows, _, queue, *_ = key
+        points, moves = value
+        size = sys.getsizeof(key) + sys.getsizeof(rows) + sum(sys.getsizeof(row) for row in rows)
+        size += sys.getsizeof(queue) + sys.getsizeof(value) + sys.getsizeof(points) + sys.getsizeof(moves)
+        for move in moves:
+            cells = move[1]
+            size += sys.getsizeof(move) + sys.getsizeof(cells) + sum(sys.getsizeof(cell) for cell in cells)
+        return size + 100
+
+    def get(self, key: tuple):
+        """
+        :param key: searched position
+        :return: stored result or None
+        """
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return value
+
+    def put(self, key: tuple, value: tuple):
+        """
+        Store a result and evict the least recently used ones above the memory budget
+        :param key: searched position
+        :param value: result of the search
+        """
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.entries[key] = value
+            return
+
+        self.entries[key] = value
+        self.bytes += self.entry_size(key, value)
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            old_key, old_value = self.entries.popitem(last=False)
+            self.bytes -= self.entry_size(old_key, old_value)
+
+    def clear(self):
+        """
+        Remove all entries
+        """
+        self.entries.clear()
+        self.bytes = 0
+
+
+class Solver:
+    """
+    Depth limited search over the piece queue.
+    In 'perfect' mode it looks for a sequence that empties the board, in 'score' mode for the most points.
+    """
+    def __init__(self, mode: str = 'score', depth: int = 3, max_holes: int = 2, max_bytes: int = 64 * 1024 * 1024,
+                 columns: int = COLUMNS):
+        """
+        :param mode: 'perfect' or 'score'
+        :param depth: maximum number of pieces placed
+        :param max_holes: branches with more holes are pruned
+        :param max_bytes: memory budget of the transposition table
+        :param columns: number of columns of the boards
+        """
+        self.mode = mode
+        self.columns = columns
+        self.depth = depth
+        self.max_holes = max_holes
+        self.table = TranspositionTable(max_bytes)
+        self.nodes = 0
+        self.root_holes = 0
+
+    def solve(self, rows: tuple[int, ...], queue: list[str], lines: int = 0) -> tuple[int, list]:
+        """
+        Search the best sequence for the board
+        :param rows: board as one bitmask per row
+        :param queue: shapes of the next pieces, starting with the current one
+        :param lines: lines cleared so far, used for the level
+        :return: points of the sequence (-1 if nothing was found) and its placements as (shape, cells)
+        """
+        self.nodes = 0
+        self.root_holes = holes(tuple(rows))
+        value, moves = self.search(tuple(rows), tuple(queue[:self.depth]), lines)
+        return (value[0], moves) if moves else (-1, [])
+
+    def prune(self, rows: tuple[int, ...], remaining: int) -> bool:
+        """
+        Check whether a board can be discarded
+        :param rows: board as one bitmask per row
+        :param remaining: number of pieces left to place
+        :return: true if the branch can not lead to a useful result
+        """
+        if holes(rows) > self.root_holes + self.max_holes:
+            return True
+
+        if self.mode == 'perfect':
+            # the filled cells plus 4 per piece must fill whole rows up to at least the stack height
+            filled = sum(bin(row).count('1') for row in rows)
+            height = next((len(rows) - y for y, row in enumerate(rows) if row), 0)
+            return not any((filled + 4 * pieces) % self.columns == 0
+                           and (filled + 4 * pieces) // self.columns >= height
+                           for pieces in range(1, remaining + 1))
+        return False
+
+    def evaluate(self, rows: tuple[int, ...], remaining: int) -> tuple[int, int, int, int]:
+        """
+        Value of a board at the end of a sequence, compared as a tuple.
+        In 'perfect' mode only empty boards are valid and shorter sequences win, in 'score' mode points win and
+        fewer holes and a lower stack break ties.
+        :param rows: board as one bitmask per row
+        :param remaining: number of pieces of the queue left unused
+        :return: (points, remaining pieces, -holes, -height), points are -1 for invalid boards
+        """
+        if self.mode == 'perfect':
+            return (0, remaining, 0, 0) if not any(rows) else (-1, 0, 0, 0)
+        height = next((len(rows) - y for y, row in enumerate(rows) if row), 0)
+        return 0, 0, -holes(rows), -height
+
+    def search(self, rows: tuple[int, ...], queue: tuple[str, ...], lines: int) -> tuple[tuple, list]:
+        """
+        Recursive depth first search
+        :return: value and placements of the best sequence starting from this board
+        """
+        self.nodes += 1
+        if not queue or (self.mode == 'perfect' and not any(rows)):
+            return self.evaluate(rows, len(queue)), []
+
+        # points depend on the level and on how many lines are left before the next one, pruning on the root holes
+        key = (rows, self.columns, queue, lines, self.root_holes)
+        stored = self.table.get(key)
+        if stored is not None:
+            return stored
+
+        best = ((-1, 0, 0, 0), [])
+        if not self.prune(rows, len(queue)):
+            for cells in placements(rows, queue[0], self.columns):
+                new_rows, cleared = place(rows, cells, self.columns)
+                value, moves = self.search(new_rows, queue[1:], lines + cleared)
+                if value[0] < 0:
+                    continue
+
+                value = (value[0] + score(cleared, lines), *value[1:])
+                if value > best[0]:
+                    best = (value, [(queue[0], cells)] + moves)
+
+        self.table.put(key, best)
+        return best
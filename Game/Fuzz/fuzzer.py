@@ -0,0 +1,291 @@
+"""
+This is the fuzzer module, it plays seeded random or adversarial input against games off-screen and checks the rules
+of the game after every step. Failing cases are minimised and written out as replayable logs.
+"""
+
+import json
+import multiprocessing as mp
+import os
+import random
+from argparse import ArgumentParser
+
+from settings import COLUMNS, ROWS, K_LEFT, K_RIGHT, K_UP, K_DOWN, K_SPACE, K_ESCAPE
+from Game_Logic.board import Board
+from Game_Logic.controls import ScriptedKeys
+
+# keys that can be pressed by the fuzzer, one bit each
+KEYS = [K_LEFT, K_RIGHT, K_UP, K_DOWN, K_SPACE, K_ESCAPE]
+
+# milliseconds between steps, adversarial input also picks steps that skip or stack timer events
+FRAME_MS = 16
+ADVERSARIAL_MS = [0, 1, 16, 17, 120, 200, 500, 1000]
+
+
+class Clock:
+    """
+    Virtual clock for the game timers, time only advances between steps
+    """
+    def __init__(self):
+        # timers ignore a start time of 0
+        self.time = 1
+
+    def __call__(self) -> int:
+        """
+        :return: current time in milliseconds
+        """
+        return self.time
+
+
+def generate(seed: int, steps: int, strategy: str) -> list[tuple[int, int]]:
+    """
+    Generate the input of a run
+    :param seed: seed of the random generator
+    :param steps: number of steps
+    :param strategy: 'random' holds keys like a player, 'adversarial' changes keys and timing on every step
+    :return: (key bitmask, milliseconds) of every step
+    """
+    rng = random.Random(seed)
+    inputs = []
+    mask = 0
+    for _ in range(steps):
+        if strategy == 'adversarial':
+            inputs.append((rng.getrandbits(len(KEYS)), rng.choice(ADVERSARIAL_MS)))
+        else:
+            # hold keys for a while, escape is rare so the game is not paused most of the time
+            if rng.random() < 0.1:
+                mask = sum(1 << i for i in range(len(KEYS) - 1) if rng.random() < 0.3)
+                mask |= (rng.random() < 0.01) << (len(KEYS) - 1)
+            inputs.append((mask, FRAME_MS))
+    return inputs
+
+
+def legal(cells: list[tuple[float, float]], game_area: list[list]) -> bool:
+    """
+    Reference rule for a tetromino position: inside the walls, above the floor and not on locked blocks.
+    Cells above the board are allowed.
+    :param cells: (x, y) position of every block
+    :param game_area: the game area
+    :return: true if the tetromino may be at this position
+    """
+    for x, y in cells:
+        if not 0 <= x < len(game_area[0]) or y >= len(game_area):
+            return False
+        if y >= 0 and game_area[int(y)][int(x)]:
+            return False
+    return True
+
+
+def check(board: Board, score: int) -> tuple[str, str]:
+    """
+    Check the invariants of a game
+    :param board: board of the game
+    :param score: score before the step, the score never decreases
+    :return: (invariant, description) of the first broken invariant, None if all hold
+    """
+    game = board.game
+    tetromino = game.tetromino
+    active = [(block.pos.x, block.pos.y) for block in tetromino.blocks]
+
+    if game.score_data['score'] < score:
+        return 'score', f"score went from {score} to {game.score_data['score']}"
+
+    # locked blocks are stored at their position and counted in their row
+    for y, row in enumerate(game.game_area):
+        if len(row) != game.columns:
+            return 'game_area', f'row {y} has {len(row)} cells'
+        for x, block in enumerate(row):
+            if block and (block.pos.x, block.pos.y) != (x, y):
+                return 'game_area', f'block at ({x}, {y}) thinks it is at {tuple(block.pos)}'
+        if game.row_counts[y] != sum(1 for block in row if block):
+            return 'row_counts', f'row {y} counted {game.row_counts[y]} blocks'
+
+    if game.bools['game_over']:
+        return None
+
+    # the falling tetromino is inside the board and not on other blocks
+    for x, y in active:
+        if x != int(x) or y != int(y):
+            return 'outside', f'block at ({x}, {y}) is not on the grid'
+        if not 0 <= x < game.columns or y >= game.rows:
+            return 'outside', f'block at ({x}, {y}) is outside the board'
+        if y >= 0 and game.game_area[int(y)][int(x)]:
+            return 'overlap', f'block at ({x}, {y}) overlaps a locked block'
+    if len(set(active)) != len(active):
+        return 'overlap', f'tetromino blocks overlap each other at {active}'
+
+    # moves are allowed or refused like the reference rule says
+    for side in (-1, 1):
+        if tetromino.wall_collision(side) == legal([(x + side, y) for x, y in active], game.game_area):
+            return 'rules', f'moving {tetromino.shape} at {active} by {side} disagrees with the rules'
+    if tetromino.floor_collision() == legal([(x, y + 1) for x, y in active], game.game_area):
+        return 'rules', f'dropping {tetromino.shape} at {active} disagrees with the rules'
+    if tetromino.shape != 'O':
+        pivot = tetromino.blocks[0].pos
+        rotated = [tuple(block.rotate_block(pivot)) for block in tetromino.blocks]
+        positions = [block.pos for block in tetromino.blocks]
+        rotates = tetromino.rotate()
+        for block, pos in zip(tetromino.blocks, positions):
+            block.pos = pos
+        if rotates != legal(rotated, game.game_area):
+            return 'rules', f'rotating {tetromino.shape} at {active} disagrees with the rules'
+    return None
+
+
+def run(seed: int, inputs: list[tuple[int, int]], board_size: tuple[int, int]) -> tuple[int, str, str]:
+    """
+    Play the input against a new board and check the invariants after every step
+    :param seed: seed of the piece queue
+    :param inputs: (key bitmask, milliseconds) of every step
+    :param board_size: (columns, rows) of the board
+    :return: (step, invariant, description) of the first failure, None if the run passed
+    """
+    clock = Clock()
+    keys = ScriptedKeys()
+    board = Board(seed, keys, *board_size, get_ticks=clock)
+
+    for step, (mask, duration) in enumerate(inputs):
+        score = board.game.score_data['score']
+        clock.time += duration
+        keys.press({key for i, key in enumerate(KEYS) if mask >> i & 1})
+        try:
+            board.game.update()
+            failure = check(board, score)
+        except Exception as error:  # any crash is a failure
+            failure = 'exception', f'{type(error).__name__}: {error}'
+        if failure:
+            return step, *failure
+
+        if board.game.bools['game_over']:
+            board.restart()
+    return None
+
+
+def minimise(seed: int, inputs: list[tuple[int, int]], board_size: tuple[int, int], failure: tuple[int, str, str],
+             budget: int = 500) -> tuple[list[tuple[int, int]], tuple[int, str, str]]:
+    """
+    Remove steps from a failing input while it still breaks the same invariant
+    :param seed: seed of the piece queue
+    :param inputs: failing input
+    :param board_size: (columns, rows) of the board
+    :param failure: failure of the input
+    :param budget: maximum number of runs
+    :return: minimised input and its failure
+    """
+    inputs = inputs[:failure[0] + 1]
+    chunk = len(inputs) // 2
+    while chunk and budget:
+        i = 0
+        while i < len(inputs) and budget:
+            budget -= 1
+            candidate = inputs[:i] + inputs[i + chunk:]
+            result = run(seed, candidate, board_size)
+            if result and result[1] == failure[1]:
+                inputs, failure = candidate[:result[0] + 1], result
+            else:
+                i += chunk
+        chunk //= 2
+
+    # release keys that are not needed
+    for i, (mask, duration) in enumerate(inputs):
+        if mask and budget:
+            budget -= 1
+            candidate = inputs[:i] + [(0, duration)] + inputs[i + 1:]
+            result = run(seed, candidate, board_size)
+            if result and result[1] == failure[1]:
+                inputs, failure = candidate[:result[0] + 1], result
+    return inputs, failure
+
+
+def fuzz_seed(seed: int, steps: int, strategy: str, board_size: tuple[int, int]) -> dict:
+    """
+    Fuzz one seed
+    :param seed: seed of the input and the piece queue
+    :param steps: number of steps
+    :param strategy: 'random' or 'adversarial'
+    :param board_size: (columns, rows) of the board
+    :return: replayable log of the minimised failure, None if the run passed
+    """
+    inputs = generate(seed, steps, strategy)
+    failure = run(seed, inputs, board_size)
+    if failure is None:
+        return None
+
+    inputs, failure = minimise(seed, inputs, board_size, failure)
+    return {
+        'seed': seed,
+        'strategy': strategy,
+        'board_size': list(board_size),
+        'invariant': failure[1],
+        'description': failure[2],
+        'step': failure[0],
+        'inputs': [list(step) for step in inputs]
+    }
+
+
+def worker(job: tuple[int, int, str, tuple[int, int]]) -> tuple[int, dict]:
+    """
+    :param job: arguments of fuzz_seed
+    :return: seed and result of fuzz_seed
+    """
+    return job[0], fuzz_seed(*job)
+
+
+def fuzz(seeds: range, steps: int, strategy: str = 'random', board_size: tuple[int, int] = (COLUMNS, ROWS),
+         workers: int = None, out: str = 'fuzz_logs') -> list[dict]:
+    """
+    Fuzz many seeds in worker processes and write every failure to its own log file
+    :param seeds: seeds to run
+    :param steps: number of steps per seed
+    :param strategy: 'random' or 'adversarial'
+    :param board_size: (columns, rows) of the board
+    :param workers: number of worker processes (default number of CPUs)
+    :param out: folder of the failure logs
+    :return: logs of the failures
+    """
+    failures = []
+    jobs = [(seed, steps, strategy, board_size) for seed in seeds]
+    with mp.Pool(workers) as pool:
+        for seed, log in pool.imap_unordered(worker, jobs):
+            if log is None:
+                continue
+            failures.append(log)
+            os.makedirs(out, exist_ok=True)
+            with open(os.path.join(out, f'{strategy}-{seed}.json'), 'w', encoding='utf-8') as f:
+                json.dump(log, f)
+            print(f"seed {seed}: {log['invariant']} after {len(log['inputs'])} steps, {log['description']}")
+
+        pool.close()
+        pool.join()
+    return failures
+
+
+def replay(file: str) -> tuple[int, str, str]:
+    """
+    Run the input of a failure log again
+    :param file: path of the log
+    :return: failure of the run, None if it passes now
+    """
+    with open(file, 'r', encoding='utf-8') as f:
+        log = json.load(f)
+    return run(log['seed'], [tuple(step) for step in log['inputs']], tuple(log['board_size']))
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description='Tetris rule fuzzer')
+    parser.add_argument('--seeds', type=int, default=100, help='number of seeds to run')
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--steps', type=int, default=5000, help='steps per seed')
+    parser.add_argument('--strategy', choices=['random', 'adversarial'], default='random')
+    parser.add_argument('--columns', type=int, default=COLUMNS)
+    parser.add_argument('--rows', type=int, default=ROWS)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default number of CPUs)')
+    parser.add_argument('--out', default='fuzz_logs', help='folder of the failure logs')
+    parser.add_argument('--replay', help='run a failure log again instead of fuzzing')
+    args = parser.parse_args()
+
+    if args.replay:
+        print(replay(args.replay) or 'passed')
+    else:
+        found = fuzz(range(args.first_seed, args.first_seed + args.seeds), args.steps, args.strategy,
+                     (args.columns, args.rows), args.workers, args.out)
+        print(f'{args.seeds} seeds, {args.steps} steps each, {len(found)} failures')
@@ -0,0 +1,86 @@
+"""
+This is the atlas module, it caches the assets (fonts, images, block textures and grid overlays) shared by every
+component. Assets are loaded on first use and rasterised once per size, the caches are bounded so resizing the window
+many times does not keep every old size.
+"""
+
+from functools import lru_cache
+from os import path
+
+import pygame as pg
+
+from settings import LINE_COLOUR
+
+
+@lru_cache(maxsize=32)
+def font(size: int) -> pg.font.Font:
+    """
+    :param size: font size
+    :return: the game font, loaded once per size
+    """
+    return pg.font.Font(path.join('Assets', 'Silkscreen-Regular.ttf'), size)
+
+
+@lru_cache(maxsize=64)
+def image(name: str, size: tuple[int, int] = None) -> pg.Surface:
+    """
+    Load an image from the Assets folder once per size
+    :param name: path of the image relative to Assets, with / as separator
+    :param size: (width, height) to scale the image to, None keeps the original size
+    :return: the image
+    """
+    if size is not None:
+        return pg.transform.scale(image(name), size)
+    return pg.image.load(path.join('Assets', *name.split('/'))).convert_alpha()
+
+
+def sprite_image() -> pg.Surface:
+    """
+    :return: the block sprite
+    """
+    return image('sprite.png')
+
+
+@lru_cache(maxsize=64)
+def block_texture(colour: str, cell: int) -> pg.Surface:
+    """
+    Tint and scale the block sprite once per colour and cell size
+    :param colour: hex colour of the block
+    :param cell: size of the block in pixels
+    :return: the block texture
+    """
+    image = sprite_image().copy()
+
+    # convert hex to RGB
+    hex_color = colour.lstrip('#')
+    rgb = tuple(int(hex_color[i:i + 2], 16) for i in (0, 2, 4))
+
+    # multiply tetromino colour on sprite
+    image.fill((rgb[0], rgb[1], rgb[2], 255), special_flags=pg.BLEND_RGBA_MULT)
+
+    # resize sprite to match cell size
+    return pg.transform.scale(image, (cell, cell))
+
+
+@lru_cache(maxsize=16)
+def grid_overlay(columns: int, rows: int, cell: int) -> pg.Surface:
+    """
+    Draw the grid lines once per board size
+    :param columns: number of columns of the board
+    :param rows: number of rows of the board
+    :param cell: size of a cell in pixels
+    :return: transparent surface with the grid lines
+    """
+    overlay = pg.Surface((columns * cell, rows * cell))
+    overlay.fill((0, 200, 0))
+    overlay.set_colorkey((0, 200, 0), pg.RLEACCEL)
+
+    # draw lines in X axis
+    for x in range(1, columns):
+        pg.draw.line(overlay, LINE_COLOUR, (x * cell, 0), (x * cell, overlay.get_height()))
+
+    # draw lines in Y axis
+    for y in range(1, rows):
+        pg.draw.line(overlay, LINE_COLOUR, (0, y * cell), (overlay.get_width(), y * cell))
+
+    return overlay
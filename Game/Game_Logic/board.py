@@ -0,0 +1,60 @@
+"""
+This is the board module, it runs a game with its own piece queue and score outside of the main application
+"""
+
+from random import Random
+
+from settings import TETROMINOS, COLUMNS, ROWS
+from Game_Logic.controls import RandomKeys
+from Game_Logic.game import Game
+
+
+class Board:
+    """
+    A game with its own piece queue and score, driven by any input source
+    """
+    def __init__(self, seed: int = None, keys=None, columns: int = COLUMNS, rows: int = ROWS,
+                 get_ticks: () = None):
+        """
+        :param seed: seed for the piece queue and the random input
+        :param keys: input source driving the game, random input if None
+        :param columns: number of columns of the board
+        :param rows: number of rows of the board
+        :param get_ticks: clock of the game returning the current time in milliseconds (default pygame clock)
+        """
+        self.random = Random(seed)
+        self.keys = keys if keys is not None else RandomKeys(seed)
+        self.board_size = (columns, rows)
+        self.get_ticks = get_ticks
+        self.next_shape = []
+        self.score_data = [1, 0, 0]  # level, score, lines
+        self.game = None
+        self.restart()
+
+    def restart(self):
+        """
+        Start a new game on this board
+        """
+        self.next_shape = [self.random.choice(list(TETROMINOS.keys())) for _ in range(3)]
+        self.score_data = [1, 0, 0]
+        self.game = Game(self.get_next, self.update_score, self.keys, save_high_score=False,
+                         columns=self.board_size[0], rows=self.board_size[1], save_telemetry=False,
+                         display=False, get_ticks=self.get_ticks)
+
+    def get_next(self) -> str:
+        """
+        Get next tetromino in the sequence
+        :return: str: The next tetromino from self.next_shape
+        """
+        next_shape = self.next_shape.pop(0)
+        self.next_shape.append(self.random.choice(list(TETROMINOS.keys())))
+        return next_shape
+
+    def update_score(self, level: int, score: int, lines: int):
+        """
+        Update score, lines and levels
+        :param lines: int number of lines cleared
+        :param score: int number of current score
+        :param level: int number of current level
+        """
+        self.score_data = [level, score, lines]
@@ -0,0 +1,62 @@
+"""
+This is the controls module, it provides input sources that can drive a game instead of the keyboard
+"""
+
+from collections import defaultdict
+from random import Random
+
+from settings import K_LEFT, K_RIGHT, K_UP, K_DOWN, K_SPACE
+
+
+class ScriptedKeys:
+    """
+    Input source with the same interface as pg.key whose keys are set from code
+    """
+    def __init__(self):
+        self.pressed = defaultdict(bool)
+        self.released = defaultdict(bool)
+
+    def press(self, keys: set[int]):
+        """
+        Set the keys held down for the next frame. Keys held in the previous frame and not any more are released.
+        :param keys: set of pygame key constants
+        """
+        self.released = defaultdict(bool, {key: True for key, held in self.pressed.items() if held and key not in keys})
+        self.pressed = defaultdict(bool, {key: True for key in keys})
+
+    def get_pressed(self) -> defaultdict:
+        """
+        :return: keys held down, indexed by pygame key constants
+        """
+        return self.pressed
+
+    def get_just_released(self) -> defaultdict:
+        """
+        :return: keys released this frame, indexed by pygame key constants
+        """
+        return self.released
+
+
+class RandomKeys(ScriptedKeys):
+    """
+    Input source that holds random game keys, used to drive boards without a player
+    """
+    KEYS = [K_LEFT, K_RIGHT, K_UP, K_DOWN, K_SPACE]
+
+    def __init__(self, seed: int = None, change: float = 0.1):
+        """
+        :param seed: seed of the random generator
+        :param change: probability of switching to new keys on every frame
+        """
+        super().__init__()
+        self.random = Random(seed)
+        self.change = change
+
+    def get_pressed(self) -> defaultdict:
+        """
+        Randomly switch the held keys, then return them
+        :return: keys held down, indexed by pygame key constants
+        """
+        if self.random.random() < self.change:
+            self.press({key for key in self.KEYS if self.random.random() < 0.3})
+        return self.pressed
@@ -3,59 +3,90 @@ This is the game module responsible for the Tetris game logic
 """
 
 from random import choice
-from os import path
 
-# component
 from settings import (
-    pg, GAME_W, GAME_H, PADDING, SIDEBAR_W, COLOURS, COLUMNS, ROWS, TETROMINOS, MOVE_DOWN_SPEED, SIDE_MOVE_DELAY,
-    ROTATE_DELAY, SCORE_POINTS, LINE_COLOUR, CELL, BG_GAME_COLOUR, OUTLINE_COLOUR
+    GAME_W, GAME_H, PADDING, SIDEBAR_W, COLOURS, COLUMNS, ROWS, MOVE_DOWN_SPEED, SIDE_MOVE_DELAY,
+    ROTATE_DELAY, SCORE_POINTS, CELL, BG_GAME_COLOUR, OUTLINE_COLOUR, K_LEFT, K_RIGHT, K_UP, K_DOWN, K_SPACE,
+    K_ESCAPE, K_BACKSPACE
 )
-from Game_Logic.tetromino import Tetromino
-from Game_Logic.timer import Timer
+from Game_Logic.layout import Layout
+from Game_Logic.tetromino import Tetromino, Block
+from Game_Logic.timer import Timer, pygame_clock
+from Game_Logic.history import BoardHistory
+from Game_Logic.telemetry import Telemetry
+
+# pygame and the assets are imported by the first Game.resize(), games that are not rendered run without them
+pg = font = block_texture = None
 
 
 class Game:
     """
     The game class is responsible for all the game logic.
-    This class renders the game and manages the game logic and loop
+    This class renders the game and manages the game logic and loop.
+    The rules do not use pygame, it is only imported to render the game and to read the keyboard.
     """
-    def __init__(self, get_next: (), update_score: ()):
+    def __init__(self, get_next: (), update_score: (), keys=None, save_high_score: bool = True,
+                 practice: bool = False, columns: int = COLUMNS, rows: int = ROWS, save_telemetry: bool = True,
+                 layout: Layout = None, display: bool = True, get_ticks: () = None):
         """
         Initialize the game class.
         This method sets up the game, initializes timers, and loads assets
+        :param keys: input source with get_pressed() and get_just_released() like pg.key (default keyboard)
+        :param save_high_score: write the score to high_score.txt on game over
+        :param practice: allow undoing tetrominos with backspace, the high score is not saved
+        :param columns: number of columns of the board
+        :param rows: number of rows of the board
+        :param save_telemetry: append the metrics of the game to telemetry.jsonl on game over
+        :param layout: layout of the window (default unscaled)
+        :param display: create the surfaces to render the game, games that are not rendered run without pygame
+        :param get_ticks: clock of the timers and telemetry returning the current time in milliseconds
+            (default pygame clock)
         """
-        self.surface = pg.Surface((GAME_W, GAME_H))
-        self.screen = pg.display.get_surface()
-        self.rect = self.surface.get_rect(topleft=(PADDING * 2 + SIDEBAR_W, PADDING))
-        self.sprite_group = pg.sprite.Group()
+        self.columns = columns
+        self.rows = rows
+        self.top_row = 0
+
+        # surface, cell size and fonts of the layout
+        if display:
+            self.resize(layout or Layout())
 
         self.get_next = get_next
         self.update_score = update_score
+        if keys is None:
+            import pygame as pg
+            keys = pg.key
+        self.keys = keys
+        self.save_high_score = save_high_score and not practice
+        self.practice = practice
+        self.save_telemetry = save_telemetry
+
+        # pieces per second, actions per minute, lock to spawn latency, line clears and stack height
+        get_ticks = get_ticks or pygame_clock()
+        self.telemetry = Telemetry(get_ticks=get_ticks)
+
+        # incremented every time a tetromino is locked, used to detect board changes
+        self.revision = 0
 
         # game over screen
         self.text_bg_colour = choice(list(COLOURS))
-        self.fonts = [
-            pg.font.Font(path.join('Assets', 'Silkscreen-Regular.ttf'), 60),
-            pg.font.Font(path.join('Assets', 'Silkscreen-Regular.ttf'), 25)
-        ]
-
-        # grid
-        self.line = self.surface.copy()
-        self.line.fill((0, 200, 0))
-        self.line.set_colorkey((0, 200, 0))
 
         # tetrominos
-        self.game_area = [[0 for _ in range(COLUMNS)] for _ in range(ROWS)]
-        self.tetromino = Tetromino(choice(list(TETROMINOS.keys())), self.sprite_group, self.create_tetromino, self.game_area)
+        self.game_area = [[0 for _ in range(columns)] for _ in range(rows)]
+
+        # number of blocks in every row and index of the highest row that may contain blocks
+        self.row_counts = [0 for _ in range(rows)]
+        self.stack_top = rows
+        # the first tetromino also comes from the piece queue, so a seeded queue fixes the whole sequence
+        self.tetromino = Tetromino(get_next(), self.create_tetromino, self.game_area)
 
         # game clock
         self.down_speed = MOVE_DOWN_SPEED
         self.down_speed_faster = SIDE_MOVE_DELAY
 
         self.timers = {
-            'horizontal': Timer(SIDE_MOVE_DELAY),
-            'vertical': Timer(self.down_speed, True, self.move_down),
-            'rotation': Timer(ROTATE_DELAY),
+            'horizontal': Timer(SIDE_MOVE_DELAY, get_ticks=get_ticks),
+            'vertical': Timer(self.down_speed, True, self.move_down, get_ticks),
+            'rotation': Timer(ROTATE_DELAY, get_ticks=get_ticks),
         }
         self.timers['vertical'].activate()
 
@@ -77,6 +108,38 @@ class Game:
 
         self.y_pos_score = [0, 0]
 
+        # cells of the suggested placement for the falling tetromino
+        self.hint = None
+
+        # every version of the board, one per tetromino
+        self.history = BoardHistory([self.row_colours(y) for y in range(rows)], self.score_data, self.tetromino.shape)
+
+    def resize(self, layout: Layout):
+        """
+        Lay out the game area in a resized window, the board is kept
+        :param layout: layout of the window
+        """
+        global pg, font, block_texture
+        import pygame as pg
+        from Game_Logic.atlas import font, block_texture, grid_overlay
+
+        self.layout = layout
+
+        # cells shrink to fit wide boards in the game area, tall boards are scrolled
+        self.cell = max(1, min(layout.px(CELL), layout.px(GAME_W) // self.columns))
+        self.visible_rows = min(self.rows, layout.px(GAME_H) // self.cell)
+
+        self.surface = pg.Surface((self.columns * self.cell, self.visible_rows * self.cell))
+        self.screen = pg.display.get_surface()
+        self.rect = self.surface.get_rect(center=layout.point(PADDING * 2 + SIDEBAR_W + GAME_W // 2,
+                                                              PADDING + GAME_H // 2))
+
+        # game over screen
+        self.font_sizes = [layout.px(60), layout.px(25)]
+
+        # grid
+        self.line = grid_overlay(self.columns, self.visible_rows, self.cell)
+
     def timer_update(self):
         """
         Update all timers
@@ -88,6 +151,9 @@ class Game:
         """
         Create a new tetromino if game is not over.
         """
+        self.revision += 1
+        self.telemetry.lock()
+
         # check if game is over
         self.check_game_over()
 
@@ -96,90 +162,158 @@ class Game:
         self.timers['vertical'].duration = self.down_speed
 
         # calculate score if previous tetromino was sped up
-        if pg.key.get_pressed()[pg.K_DOWN] and self.bools['down']:
+        if self.keys.get_pressed()[K_DOWN] and self.bools['down']:
             self.y_pos_score[1] = self.tetromino.get_y()
             self.score_data['score'] += self.y_pos_score[1] - self.y_pos_score[0]
         self.y_pos_score[0] = self.y_pos_score[1] = 0
 
+        # count the locked blocks
+        locked_rows = {int(block.pos.y) for block in self.tetromino.blocks if block.pos.y >= 0}
+        for block in self.tetromino.blocks:
+            if block.pos.y >= 0:
+                self.row_counts[int(block.pos.y)] += 1
+        self.stack_top = min([self.stack_top, *locked_rows])
+
+        # rows changed by the locked tetromino
+        changed = {y: self.row_colours(y) for y in locked_rows}
+
         # check if lines have been filled
-        self.check_full_lines()
+        cleared = self.check_full_lines(locked_rows)
 
-        # spawn new tetromino
+        # spawn new tetromino, the game is also over if it overlaps the stack
         if not self.bools['game_over']:
-            self.tetromino = Tetromino(self.get_next(), self.sprite_group, self.create_tetromino, self.game_area)
+            self.tetromino = Tetromino(self.get_next(), self.create_tetromino, self.game_area)
+            if any(self.game_area[int(block.pos.y)][int(block.pos.x)] for block in self.tetromino.blocks
+                   if block.pos.y >= 0):
+                # the version is not recorded, undo plays the tetromino that ended the game again
+                self.end_game()
+            else:
+                self.history.record(changed, cleared, self.score_data, self.tetromino.shape)
+                self.telemetry.spawn(self.rows - self.stack_top)
+
+    def row_colours(self, y: int) -> tuple:
+        """
+        :param y: index of the row
+        :return: colour of every cell of the row, None if empty
+        """
+        return tuple(block.colour if block else None for block in self.game_area[y])
+
+    def restore(self, index: int):
+        """
+        Go back to a previous version of the board, the versions after it are forgotten
+        :param index: index of the version in self.history
+        """
+        rows, self.score_data, shape = self.history.seek(index)
+        self.history.truncate(index + 1)
+
+        # rebuild blocks from the stored colours
+        self.game_area = [[0 for _ in range(self.columns)] for _ in range(self.rows)]
+        for y, row in enumerate(rows):
+            for x, colour in enumerate(row):
+                if colour:
+                    self.game_area[y][x] = Block((x, y), colour, (0, 0))
+        self.row_counts = [sum(1 for colour in row if colour) for row in rows]
+        self.stack_top = next((y for y, count in enumerate(self.row_counts) if count), self.rows)
+        self.tetromino = Tetromino(shape, self.create_tetromino, self.game_area)
+
+        # speed of the restored level, the restored tetromino starts without soft or hard drop
+        self.down_speed = MOVE_DOWN_SPEED * 0.75 ** (self.score_data['level'] - 1)
+        self.timers['vertical'].duration = self.down_speed
+        self.bools['speed'] = self.bools['down'] = self.bools['space'] = False
+        self.y_pos_score = [0, 0]
+        if self.bools['game_over']:
+            self.bools['game_over'] = False
+            self.timers['vertical'].activate()
+
+        self.revision += 1
+        self.update_score(self.score_data['level'], self.score_data['score'], self.score_data['lines'])
+
+    def undo(self):
+        """
+        Undo the last locked tetromino, after a game over the tetromino that ended the game is played again
+        """
+        index = len(self.history) - 1 if self.bools['game_over'] else len(self.history) - 2
+
+        # versions older than the memory budget have been dropped
+        if index >= self.history.first:
+            self.restore(index)
 
     def move_down(self):
         """
         Calls move_down() from tetromino to move it down
         """
-        self.tetromino.move_down()
+        # the tetromino that ended the game must not be locked again
+        if not self.bools['game_over']:
+            self.tetromino.move_down()
 
-    def check_full_lines(self):
+    def check_full_lines(self, lines: set[int]) -> list[int]:
         """
         Check for and clear full lines in the game area.
-        This method iterates through each row in the game area, identifies full lines, clears them,
-        shifts blocks above the cleared lines down, updates the game area, and calculates the score.
+        Only the rows of the locked tetromino can become full. Full rows are removed and empty rows are added on top,
+        so only the blocks between the top of the stack and the cleared lines are moved.
+        :param lines: indices of the rows the locked tetromino has been added to
+        :return: indices of the cleared lines
         """
-        # list to store lines that need to be cleared
-        clear_lines = []
-        for i, line in enumerate(self.game_area):
-            # check if all cells in the line are filled by blocks
-            if all(line):
-                clear_lines.append(i)
+        # lines that need to be cleared, from top to bottom
+        clear_lines = sorted(line for line in lines if self.row_counts[line] == self.columns)
+
+        for line in clear_lines:
+            # shift blocks above the cleared line down
+            for row in self.game_area[self.stack_top:line]:
+                for block in row:
+                    if block:
+                        block.pos.y += 1
+
+            # remove the line and add an empty one on top
+            del self.game_area[line]
+            self.game_area.insert(0, [0 for _ in range(self.columns)])
+            del self.row_counts[line]
+            self.row_counts.insert(0, 0)
+            self.stack_top = min(self.stack_top + 1, self.rows)
 
         if clear_lines:
-            # clear the blocks in the identified lines
-            for line in clear_lines:
-                for block in self.game_area[line]:
-                    block.kill()
-
-                # shift blocks above the cleared lines down
-                for row in self.game_area:
-                    for block in row:
-                        if block and block.pos.y < line:
-                            block.pos.y += 1
-
-            # update game area with the current state of the sprite group
-            self.game_area = [[0 for _ in range(COLUMNS)] for _ in range(ROWS)]
-            for block in self.sprite_group:
-                self.game_area[int(block.pos.y)][int(block.pos.x)] = block
-
             # calculate and update score based on the number of cleared lines
             self.calculate_score(len(clear_lines))
 
+        return clear_lines
+
     def user_input(self):
         """
         Process user input.
         User can move tetromino left, right and down. He can also rotate the tetromino and drop it down.
         User can also pause and unpause the game using the escape key.
         """
-        keys = pg.key.get_pressed()
-        keys2 = pg.key.get_just_released()
+        keys = self.keys.get_pressed()
+        keys2 = self.keys.get_just_released()
 
         # left - right movement
         if not self.timers['horizontal'].active and not self.bools['paused'] and not self.bools['speed']:
-            if keys[pg.K_LEFT]:
+            if keys[K_LEFT]:
                 self.tetromino.horizontal_move(-1)
                 self.timers['horizontal'].activate()
+                self.telemetry.action()
 
-            if keys[pg.K_RIGHT]:
+            if keys[K_RIGHT]:
                 self.tetromino.horizontal_move(1)
                 self.timers['horizontal'].activate()
+                self.telemetry.action()
 
         # rotation
         if not self.timers['rotation'].active and not self.bools['paused'] and not self.bools['speed']:
-            if keys[pg.K_UP]:
+            if keys[K_UP]:
                 self.tetromino.rotate()
                 self.timers['rotation'].activate()
+                self.telemetry.action()
 
         # speedup falling
-        if not self.bools['down'] and not self.bools['paused'] and keys[pg.K_DOWN] and not self.bools['speed']:
+        if not self.bools['down'] and not self.bools['paused'] and keys[K_DOWN] and not self.bools['speed']:
             self.bools['down'] = True
             self.timers['vertical'].duration = self.down_speed_faster
+            self.telemetry.action()
 
             self.y_pos_score[0] = self.tetromino.get_y()
 
-        if self.bools['down'] and not self.bools['paused'] and not keys[pg.K_DOWN] and not self.bools['speed']:
+        if self.bools['down'] and not self.bools['paused'] and not keys[K_DOWN] and not self.bools['speed']:
             self.bools['down'] = False
             self.timers['vertical'].duration = self.down_speed
 
@@ -190,21 +324,27 @@ class Game:
             self.y_pos_score[0] = self.y_pos_score[1] = 0
 
         # instant fall
-        if not self.bools['space'] and not self.bools['paused'] and keys[pg.K_SPACE] and not self.bools['speed'] and not self.bools['game_over']:
+        if not self.bools['space'] and not self.bools['paused'] and keys[K_SPACE] and not self.bools['speed'] and not self.bools['game_over']:
             self.bools['space'] = True
             self.bools['speed'] = True
+            self.telemetry.action()
 
-            self.score_data['score'] += 2 * (20 - int(self.tetromino.blocks[0].pos.y))
+            self.score_data['score'] += 2 * (self.rows - int(self.tetromino.blocks[0].pos.y))
             self.update_score(self.score_data['level'], self.score_data['score'], self.score_data['lines'])
 
             self.timers['vertical'].duration *= 0.1
 
-        if self.bools['space'] and not self.bools['paused'] and not keys[pg.K_SPACE] and not self.bools['speed']:
+        if self.bools['space'] and not self.bools['paused'] and not keys[K_SPACE] and not self.bools['speed']:
             self.bools['space'] = False
             self.timers['vertical'].duration = self.down_speed
 
+        # undo in practice mode
+        if self.practice and not self.bools['paused'] and keys2[K_BACKSPACE]:
+            self.undo()
+            return
+
         # pause / unpause
-        if self.bools['paused'] and not self.bools['game_over'] and not self.timers['vertical'].active and keys2[pg.K_ESCAPE]:
+        if self.bools['paused'] and not self.bools['game_over'] and not self.timers['vertical'].active and keys2[K_ESCAPE]:
             # un-paused game
             self.bools['paused'] = False
             self.timers['vertical'].activate()
@@ -213,7 +353,7 @@ class Game:
             self.text_bg_colour = choice(list(COLOURS))
             return
 
-        if not self.bools['paused'] and not self.bools['game_over'] and self.timers['vertical'].active and keys2[pg.K_ESCAPE]:
+        if not self.bools['paused'] and not self.bools['game_over'] and self.timers['vertical'].active and keys2[K_ESCAPE]:
             # paused game
             self.bools['paused'] = True
             self.timers['vertical'].deactivate()
@@ -228,23 +368,37 @@ class Game:
         for block in self.tetromino.blocks:
             # check if a block is above game area
             if block.pos.y < 0:
-                try:
-                    # open high score file
-                    with open('high_score.txt', 'r', encoding='utf8') as f:
-                        tmp = f.read()
-                        high_score = int(tmp) if tmp.isnumeric() else 0
-
-                        # if current score is better than high score write new high score
-                        if self.score_data['score'] > high_score:
-                            with open('high_score.txt', 'w', encoding='utf-8') as output_file:
-                                output_file.write(str(self.score_data['score']))
-                except FileNotFoundError:
-                    # if file has not been found create new file and write high score
-                    with open('high_score.txt', 'w', encoding='utf-8') as f:
-                        f.write(str(self.score_data['score']))
-
-                # game is over
-                self.bools['game_over'] = True
+                self.end_game()
+                return
+
+    def end_game(self):
+        """
+        End the game, save the high score and the telemetry record
+        """
+        self.bools['game_over'] = True
+        if self.save_high_score:
+            self.write_high_score()
+        if self.save_telemetry:
+            self.telemetry.export()
+
+    def write_high_score(self):
+        """
+        Write the current score to the high score file if it beats the stored high score
+        """
+        try:
+            # open high score file
+            with open('high_score.txt', 'r', encoding='utf8') as f:
+                tmp = f.read()
+                high_score = int(tmp) if tmp.isnumeric() else 0
+
+                # if current score is better than high score write new high score
+                if self.score_data['score'] > high_score:
+                    with open('high_score.txt', 'w', encoding='utf-8') as output_file:
+                        output_file.write(str(self.score_data['score']))
+        except FileNotFoundError:
+            # if file has not been found create new file and write high score
+            with open('high_score.txt', 'w', encoding='utf-8') as f:
+                f.write(str(self.score_data['score']))
 
     def calculate_score(self, num_lines: int):
         """
@@ -253,6 +407,7 @@ class Game:
         """
         # add lines to line count
         self.score_data['lines'] += num_lines
+        self.telemetry.clear(num_lines)
 
         # calculate score
         self.score_data['score'] += SCORE_POINTS[num_lines] * self.score_data['level']
@@ -266,18 +421,27 @@ class Game:
 
         self.update_score(self.score_data['level'], self.score_data['score'], self.score_data['lines'])
 
-    def render_grid(self):
+    def render_blocks(self):
         """
-        Render game area grid
+        Render the blocks in the visible rows, the view scrolls to keep the falling tetromino in sight
         """
-        # draw lines in X axis
-        for x in range(1, COLUMNS):
-            pg.draw.line(self.surface, LINE_COLOUR, (x * CELL, 0), (x * CELL, self.surface.get_height()))
+        self.top_row = max(0, min(self.tetromino.get_y() - self.visible_rows // 3, self.rows - self.visible_rows))
+        bottom_row = self.top_row + self.visible_rows
 
-        # draw lines in Y axis
-        for y in range(1, ROWS):
-            pg.draw.line(self.surface, LINE_COLOUR, (0, y * CELL), (self.surface.get_width(), y * CELL))
+        blocks = [(x, y, block) for y in range(self.top_row, bottom_row)
+                  for x, block in enumerate(self.game_area[y]) if block]
+        if not self.bools['game_over']:
+            blocks += [(int(block.pos.x), int(block.pos.y), block) for block in self.tetromino.blocks
+                       if self.top_row <= block.pos.y < bottom_row]
+
+        self.surface.fblits([(block_texture(block.colour, self.cell), (x * self.cell, (y - self.top_row) * self.cell))
+                             for x, y, block in blocks])
 
+    def render_grid(self):
+        """
+        Render game area grid
+        The grid is drawn once and shared between boards, so rendering it is a single blit
+        """
         self.surface.blit(self.line, (0, 0))
 
     def pause_game_over_screen(self, texts: list[str], x_offset: list[int]):
@@ -291,10 +455,10 @@ class Game:
 
         # end screen text
         text_positions = [
-            (self.surface.get_width() // 2, self.surface.get_height() // 2 - 150),
-            (self.surface.get_width() // 2, self.surface.get_height() // 2 - 105)
+            (self.surface.get_width() // 2, self.surface.get_height() // 2 - self.layout.px(150)),
+            (self.surface.get_width() // 2, self.surface.get_height() // 2 - self.layout.px(105))
         ]
-        fonts = [self.fonts[0], self.fonts[1]]
+        fonts = [font(self.font_sizes[0]), font(self.font_sizes[1])]
 
         # render text and background
         for text, pos, font_1 in zip(texts, text_positions, fonts):
@@ -302,26 +466,52 @@ class Game:
             text_rect = text_surface.get_rect(center=pos)
 
             # render text background with random colour
-            background_rect = pg.Rect(text_rect.x - x_offset[0], text_rect.y, text_rect.width + x_offset[1],
-                                      text_rect.height + 10)
+            background_rect = pg.Rect(text_rect.x - self.layout.px(x_offset[0]), text_rect.y,
+                                      text_rect.width + self.layout.px(x_offset[1]),
+                                      text_rect.height + self.layout.px(10))
             pg.draw.rect(self.surface, self.text_bg_colour, background_rect)
 
             self.surface.blit(text_surface, text_rect)
 
+    def board_key(self) -> tuple:
+        """
+        :return: value that changes whenever the visible board changes
+        """
+        return self.revision, self.bools['game_over'], tuple((int(block.pos.x), int(block.pos.y))
+                                                             for block in self.tetromino.blocks)
+
+    def update(self):
+        """
+        Update the game logic without rendering
+        """
+        self.user_input()
+        self.timer_update()
+
     def game_loop(self):
         """
         Loop of the game logic
         The loop continuously updates and renders the game components
         """
-        self.user_input()
-        self.timer_update()
-        self.sprite_group.update()
+        self.update()
+        self.render()
 
-        # rendering
+        self.screen.blit(self.surface, self.rect)
+        pg.draw.rect(self.screen, OUTLINE_COLOUR, self.rect, 2, 5)
+
+    def render(self):
+        """
+        Render the game area onto self.surface
+        """
         self.surface.fill(BG_GAME_COLOUR)
-        self.sprite_group.draw(self.surface)
+        self.render_blocks()
         self.render_grid()
 
+        # render solver hint
+        if self.hint and not self.bools['paused']:
+            for x, y in self.hint:
+                pg.draw.rect(self.surface, OUTLINE_COLOUR,
+                             (x * self.cell, (y - self.top_row) * self.cell, self.cell, self.cell), 3)
+
         # render pause screen
         if self.bools['paused'] and not self.bools['game_over']:
             self.pause_game_over_screen(["Paused", "Press Escape to Continue"], [110, 210])
@@ -329,6 +519,3 @@ class Game:
         # render game over screen
         if self.bools['game_over']:
             self.pause_game_over_screen(["Game Over", "Press Space to Restart"], [50, 100])
-
-        self.screen.blit(self.surface, (PADDING * 2 + SIDEBAR_W, PADDING))
-        pg.draw.rect(self.screen, OUTLINE_COLOUR, self.rect, 2, 5)
@@ -0,0 +1,129 @@
+"""
+This is the history module, it stores every version of the board for undo and for jumping to any move of a game
+"""
+
+import sys
+
+
+class BoardHistory:
+    """
+    Persistent board history.
+    Rows are immutable tuples shared between versions, so a version only stores the rows that changed (at most the
+    four rows of the locked tetromino) and the lines it cleared. A full list of row references is kept as a keyframe
+    every keyframe_interval versions, seeking copies the nearest keyframe and replays the deltas after it.
+    """
+    def __init__(self, rows: list[tuple], score_data: dict, shape: str, keyframe_interval: int = 64,
+                 max_bytes: int = 16 * 1024 * 1024):
+        """
+        :param rows: initial board, one tuple of colours (None if empty) per row
+        :param score_data: initial level, score and lines
+        :param shape: shape of the first tetromino
+        :param keyframe_interval: number of versions between two keyframes
+        :param max_bytes: approximate memory budget, the oldest versions are dropped above it
+        """
+        self.keyframe_interval = keyframe_interval
+        self.max_bytes = max_bytes
+        self.bytes = 0
+
+        # every version is (keyframe rows or None, changed rows, cleared lines, score data, shape)
+        self.versions = []
+        self.first = 0  # index of the oldest version still stored
+        self.current = list(rows)
+        self.empty_row = (None,) * len(rows[0])
+
+        self.append(tuple(rows), (), (), score_data, shape)
+
+    def __len__(self) -> int:
+        """
+        :return: index after the newest version
+        """
+        return self.first + len(self.versions)
+
+    def append(self, keyframe: tuple, changed: tuple, cleared: tuple, score_data: dict, shape: str):
+        """
+        Store a version and drop the oldest ones when the memory budget is exceeded
+        """
+        version = (keyframe, changed, cleared, tuple(score_data.values()), shape)
+        self.versions.append(version)
+        self.bytes += self.version_size(version)
+
+        # drop whole keyframe intervals so the oldest version is always a keyframe
+        while self.bytes > self.max_bytes and len(self.versions) > self.keyframe_interval:
+            for version in self.versions[:self.keyframe_interval]:
+                self.bytes -= self.version_size(version)
+            del self.versions[:self.keyframe_interval]
+            self.first += self.keyframe_interval
+
+    @staticmethod
+    def version_size(version: tuple) -> int:
+        """
+        :return: approximate memory used by a version, shared rows are only counted for the version creating them
+        """
+        keyframe, changed, cleared, _, _ = version
+        size = sys.getsizeof(version) + sys.getsizeof(changed) + sys.getsizeof(cleared) + 100
+        if keyframe is not None:
+            size += sys.getsizeof(keyframe)
+        return size + sum(sys.getsizeof(row) + 16 for _, row in changed)
+
+    def record(self, changed: dict[int, tuple], cleared: list[int], score_data: dict, shape: str):
+        """
+        Store the board after a tetromino has been locked
+        :param changed: rows changed by the locked tetromino before clearing lines, {index: tuple of colours}
+        :param cleared: indices of the cleared lines
+        :param score_data: level, score and lines after the lock
+        :param shape: shape of the next tetromino
+        """
+        changed = tuple(changed.items())
+        cleared = tuple(cleared)
+        self.apply(self.current, changed, cleared)
+
+        keyframe = tuple(self.current) if len(self) % self.keyframe_interval == 0 else None
+        self.append(keyframe, changed, cleared, score_data, shape)
+
+    def apply(self, rows: list[tuple], changed: tuple, cleared: tuple):
+        """
+        Apply a version's changes to a board
+        :param rows: board to modify
+        :param changed: (index, row) pairs
+        :param cleared: indices of the cleared lines
+        """
+        for i, row in changed:
+            rows[i] = row
+        for i in cleared:
+            del rows[i]
+            rows.insert(0, self.empty_row)
+
+    def seek(self, index: int) -> tuple[list[tuple], dict, str]:
+        """
+        Rebuild any stored version
+        :param index: index of the version, negative indices count from the newest one
+        :return: the board, the score data and the shape of the tetromino to play
+        """
+        if index < 0:
+            index += len(self)
+        if not self.first <= index < len(self):
+            raise IndexError(f'version {index} is not stored')
+
+        # nearest keyframe before the version
+        start = index - self.first
+        while self.versions[start][0] is None:
+            start -= 1
+
+        rows = list(self.versions[start][0])
+        for _, changed, cleared, _, _ in self.versions[start + 1:index - self.first + 1]:
+            self.apply(rows, changed, cleared)
+
+        _, _, _, score_data, shape = self.versions[index - self.first]
+        return rows, dict(zip(('level', 'score', 'lines'), score_data)), shape
+
+    def truncate(self, length: int):
+        """
+        Forget every version from the given index on (used for undo)
+        :param length: number of versions to keep, the oldest stored version is always kept
+        """
+        if not self.first < length <= len(self):
+            raise IndexError(f'cannot keep {length} versions, versions {self.first} to {len(self) - 1} are stored')
+        for version in self.versions[length - self.first:]:
+            self.bytes -= self.version_size(version)
+        del self.versions[length - self.first:]
+        self.current = self.seek(length - 1)[0]
@@ -0,0 +1,40 @@
+"""
+This is the layout module, it maps the window layout of settings.py onto a window of any size
+"""
+
+from math import floor
+
+from settings import WINDOW_W, WINDOW_H
+
+
+class Layout:
+    """
+    Scale and offset of the window layout.
+    Sizes and positions in settings.py are given for a WINDOW_W x WINDOW_H window, the layout scales them uniformly to
+    fit the window and centers the result. The scale is rounded down to steps of 1 / STEPS so resizing the window only
+    rasterises the assets again for a few scales.
+    """
+    STEPS = 20
+
+    def __init__(self, size: tuple[int, int] = (WINDOW_W, WINDOW_H)):
+        """
+        :param size: (width, height) of the window
+        """
+        self.size = size
+        self.scale = max(1, floor(min(size[0] / WINDOW_W, size[1] / WINDOW_H) * self.STEPS)) / self.STEPS
+        self.offset = ((size[0] - self.px(WINDOW_W)) // 2, (size[1] - self.px(WINDOW_H)) // 2)
+
+    def px(self, value: float) -> int:
+        """
+        :param value: size in pixels of the unscaled layout
+        :return: size in pixels of the window
+        """
+        return round(value * self.scale)
+
+    def point(self, x: float, y: float) -> tuple[int, int]:
+        """
+        :param x: x position in the unscaled layout
+        :param y: y position in the unscaled layout
+        :return: (x, y) position in the window
+        """
+        return self.offset[0] + self.px(x), self.offset[1] + self.px(y)
@@ -0,0 +1,66 @@
+"""
+This is the observation module, it exports rendered frames as NumPy arrays for agents and video capture
+"""
+
+import numpy as np
+import pygame as pg
+
+
+class FrameBuffer:
+    """
+    Ring buffer of rendered frames.
+    Frames are read through pg.surfarray.pixels3d, which references the surface pixels directly, so the only copy
+    made is the one into the preallocated ring slot.
+    """
+    def __init__(self, size: tuple[int, int], capacity: int = 64, step: int = 1):
+        """
+        Initialize the frame buffer
+        :param size: (width, height) of the surface that will be captured
+        :param capacity: number of frames kept before the oldest ones are overwritten
+        :param step: downsampling step in pixels (e.g. the cell size keeps one pixel from the center of every cell)
+        """
+        self.step = step
+        # sample the center of each step x step square instead of its top left corner
+        self.start = step // 2
+
+        width = len(range(self.start, size[0], step))
+        height = len(range(self.start, size[1], step))
+
+        self.frames = np.zeros((capacity, width, height, 3), dtype=np.uint8)
+        self.capacity = capacity
+        self.index = 0
+        self.count = 0
+
+    def capture(self, surface: pg.Surface):
+        """
+        Copy the surface pixels into the next ring slot
+        :param surface: surface to capture, must have the size given to the buffer
+        """
+        pixels = pg.surfarray.pixels3d(surface)
+        self.frames[self.index] = pixels[self.start::self.step, self.start::self.step]
+        # release the surface lock taken by pixels3d
+        del pixels
+
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def latest(self) -> np.ndarray:
+        """
+        :return: view of the most recently captured frame, indexed [x][y][rgb] like pg.surfarray
+        """
+        return self.frames[(self.index - 1) % self.capacity]
+
+    def batch(self) -> np.ndarray:
+        """
+        :return: copy of all captured frames ordered from oldest to newest
+        """
+        if self.count < self.capacity:
+            return self.frames[:self.count].copy()
+        return np.roll(self.frames, -self.index, axis=0)
+
+    def clear(self):
+        """
+        Forget all captured frames
+        """
+        self.index = 0
+        self.count = 0
@@ -0,0 +1,141 @@
+"""
+This is the telemetry module, it records how a game is played (pieces per second, actions per minute, lock to spawn
+latency, line clears and stack height) so slowdowns and gravity can be checked after a game
+"""
+
+import json
+from array import array
+from time import perf_counter
+
+from Game_Logic.timer import pygame_clock
+
+
+class Telemetry:
+    """
+    Per-game metrics.
+    Every locked tetromino writes one entry into preallocated ring buffers, so recording allocates no containers and
+    the memory used does not grow with the length of the game.
+    """
+    def __init__(self, capacity: int = 256, get_ticks: () = None):
+        """
+        :param capacity: number of tetrominos kept in the ring buffers, rates are measured over this window
+        :param get_ticks: clock returning the current time in milliseconds (default pygame clock)
+        """
+        self.get_ticks = get_ticks or pygame_clock()
+        self.capacity = capacity
+        self.index = 0
+        self.count = 0
+
+        # one entry per tetromino
+        self.spawn_times = array('d', [0.0] * capacity)  # game time in milliseconds
+        self.latencies = array('d', [0.0] * capacity)  # lock to spawn in milliseconds
+        self.heights = array('I', [0] * capacity)  # stack height after the lock
+        self.action_counts = array('I', [0] * capacity)  # actions so far
+
+        # totals
+        self.start_time = self.get_ticks()
+        self.lock_time = 0.0
+        self.pieces = 0
+        self.actions = 0
+        self.clears = array('I', [0] * 5)  # number of single, double, triple and tetris clears at index 1 to 4
+        self.max_height = 0
+
+    def action(self):
+        """
+        Count a move, rotation or drop of the player
+        """
+        self.actions += 1
+
+    def lock(self):
+        """
+        Mark the moment a tetromino has locked
+        """
+        self.lock_time = perf_counter()
+
+    def clear(self, lines: int):
+        """
+        Count a line clear
+        :param lines: number of lines cleared at once
+        """
+        self.clears[lines] += 1
+
+    def spawn(self, height: int):
+        """
+        Record the tetromino locked since the last call, once the next one has spawned
+        :param height: height of the stack
+        """
+        i = self.index
+        self.spawn_times[i] = self.get_ticks()
+        self.latencies[i] = (perf_counter() - self.lock_time) * 1000
+        self.heights[i] = height
+        self.action_counts[i] = self.actions
+
+        self.index = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.pieces += 1
+        self.max_height = max(self.max_height, height)
+
+    def window(self) -> tuple[int, int]:
+        """
+        :return: ring indices of the oldest and the newest entry
+        """
+        return (self.index - self.count) % self.capacity, (self.index - 1) % self.capacity
+
+    def pps(self) -> float:
+        """
+        :return: pieces per second over the ring buffer window
+        """
+        oldest, newest = self.window()
+        if self.count < 2 or self.spawn_times[newest] == self.spawn_times[oldest]:
+            return 0.0
+        return (self.count - 1) * 1000 / (self.spawn_times[newest] - self.spawn_times[oldest])
+
+    def apm(self) -> float:
+        """
+        :return: actions per minute over the ring buffer window
+        """
+        oldest, newest = self.window()
+        if self.count < 2 or self.spawn_times[newest] == self.spawn_times[oldest]:
+            return 0.0
+        actions = self.action_counts[newest] - self.action_counts[oldest]
+        return actions * 60000 / (self.spawn_times[newest] - self.spawn_times[oldest])
+
+    def latency(self) -> float:
+        """
+        :return: average lock to spawn latency in milliseconds over the ring buffer window
+        """
+        return sum(self.latencies[:self.count]) / self.count if self.count else 0.0
+
+    def height(self) -> int:
+        """
+        :return: stack height after the last tetromino
+        """
+        return self.heights[(self.index - 1) % self.capacity] if self.count else 0
+
+    def record(self) -> dict:
+        """
+        :return: summary of the game, with the stack heights of the last tetrominos from oldest to newest
+        """
+        oldest, _ = self.window()
+        heights = [self.heights[(oldest + i) % self.capacity] for i in range(self.count)]
+        seconds = (self.get_ticks() - self.start_time) / 1000
+        return {
+            'seconds': round(seconds, 2),
+            'pieces': self.pieces,
+            'actions': self.actions,
+            'pps': round(self.pieces / seconds, 3) if seconds else 0.0,
+            'apm': round(self.actions * 60 / seconds, 1) if seconds else 0.0,
+            'latency_ms': round(self.latency(), 3),
+            'max_latency_ms': round(max(self.latencies[:self.count], default=0.0), 3),
+            'clears': list(self.clears[1:]),
+            'max_height': self.max_height,
+            'heights': heights
+        }
+
+    def export(self, file: str = 'telemetry.jsonl'):
+        """
+        Append the summary of the game as one line of JSON
+        :param file: path of the file
+        """
+        with open(file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(self.record(), separators=(',', ':')) + '\n')
@@ -2,23 +2,26 @@
 This is the tetromino module, it is responsible for representing the pieces used to play the Tetris game
 """
 
-from os import path
-from settings import pg, TETROMINOS, COLUMNS, ROWS, CELL
+from settings import TETROMINOS
 
 
 class Tetromino:
     """
     Class to represent a Tetromino in the game
     """
-    def __init__(self, shape: str, sprite_group: pg.sprite.Group, create_tetromino, game_area: list[list]):
+    def __init__(self, shape: str, create_tetromino, game_area: list[list]):
         self.block_pos = TETROMINOS[shape]['shape']
         self.colour = TETROMINOS[shape]['colour']
-        self.offset = TETROMINOS[shape]['offset']
         self.create_tetromino = create_tetromino
         self.game_area = game_area
         self.shape = shape
 
-        self.blocks = [Block(sprite_group, pos, self.colour, self.offset) for pos in self.block_pos]
+        # board size is taken from the game area
+        self.columns = len(game_area[0])
+        self.rows = len(game_area)
+        self.offset = (self.columns // 2 + TETROMINOS[shape]['offset'][0], TETROMINOS[shape]['offset'][1])
+
+        self.blocks = [Block(pos, self.colour, self.offset) for pos in self.block_pos]
 
     def wall_collision(self, side: int) -> bool:
         """
@@ -70,7 +73,9 @@ class Tetromino:
         # if tetromino has collided update game_area and create new tetromino
         else:
             for block in self.blocks:
-                self.game_area[int(block.pos.y)][int(block.pos.x)] = block
+                # blocks above the board end the game and are not stored, a negative index would wrap to the bottom
+                if block.pos.y >= 0:
+                    self.game_area[int(block.pos.y)][int(block.pos.x)] = block
             self.create_tetromino()
 
     def rotate(self) -> bool:
@@ -85,15 +90,15 @@ class Tetromino:
 
             for pos in new_pos:
                 # if rotation is outside game area don't rotate and return false
-                if pos.x < 0 or pos.x >= COLUMNS:
+                if pos.x < 0 or pos.x >= self.columns:
                     return False
 
                 # if tetromino is on ground return false
-                if pos.y >= ROWS:
+                if pos.y >= self.rows:
                     return False
 
-                # if tetromino has collided with other tetrominos return false
-                if self.game_area[int(pos.y)][int(pos.x)]:
+                # if tetromino has collided with other tetrominos return false, rows above the board are empty
+                if pos.y >= 0 and self.game_area[int(pos.y)][int(pos.x)]:
                     return False
 
             # rotate tetromino and return true
@@ -103,31 +108,28 @@ class Tetromino:
         return False
 
 
-class Block(pg.sprite.Sprite):
+class Position:
     """
-    Class to represent a block in the Tetromino
+    Cell position of a block, (x, y) from the top left of the game area
     """
-    def __init__(self, group: pg.sprite.Group, pos: tuple[int, int], colour: str, offset: pg.Vector2):
-        super().__init__(group)
-
-        # load sprite image
-        sprite_image = pg.image.load(path.join('Assets', 'sprite.png')).convert_alpha()
+    __slots__ = ('x', 'y')
 
-        # convert hex to RGB
-        hex_color = colour.lstrip('#')
-        rgb = tuple(int(hex_color[i:i + 2], 16) for i in (0, 2, 4))
+    def __init__(self, x: int, y: int):
+        self.x = x
+        self.y = y
 
-        # multiply tetromino colour on sprite
-        sprite_image.fill((rgb[0], rgb[1], rgb[2], 255), special_flags=pg.BLEND_RGBA_MULT)
+    def __iter__(self):
+        return iter((self.x, self.y))
 
-        # resize sprite to match CELL size
-        sprite_image = pg.transform.scale(sprite_image, (CELL, CELL))
 
-        self.image = sprite_image
-        self.pos = pg.Vector2(pos) + offset
-        x = self.pos.x * CELL
-        y = self.pos.y * CELL
-        self.rect = self.image.get_rect(topleft=(x, y))
+class Block:
+    """
+    Class to represent a block in the Tetromino.
+    A block is only a position and a colour, the game renders it with the texture of its colour.
+    """
+    def __init__(self, pos: tuple[int, int], colour: str, offset: tuple[int, int]):
+        self.colour = colour
+        self.pos = Position(pos[0] + offset[0], pos[1] + offset[1])
 
     def wall_collide(self, x: int, game_area: list[list]) -> bool:
         """
@@ -136,7 +138,7 @@ class Block(pg.sprite.Sprite):
         :param game_area: the game area
         :return: true if collided, otherwise false
         """
-        if (not 0 <= x < COLUMNS) or (game_area[int(self.pos.y)][x]):
+        if (not 0 <= x < len(game_area[0])) or (self.pos.y >= 0 and game_area[int(self.pos.y)][x]):
             return True
         return False
 
@@ -147,24 +149,15 @@ class Block(pg.sprite.Sprite):
         :param game_area: the game area
         :return: true if collided, otherwise false
         """
-        if y >= ROWS or (y >= 0 and game_area[y][int(self.pos.x)]):
+        if y >= len(game_area) or (y >= 0 and game_area[y][int(self.pos.x)]):
             return True
         return False
 
-    def rotate_block(self, pivot: pg.Vector2) -> pg.Vector2:
+    def rotate_block(self, pivot: Position) -> Position:
         """
         Rotates the block around the pivot
         :param pivot: rotation pivot
         :return: new position of the block
         """
-        distance = self.pos - pivot
-        rotated = distance.rotate(90)
-        return pivot + rotated
-
-    def update(self):
-        """
-        Updates the block position
-        """
-        x = self.pos.x * CELL
-        y = self.pos.y * CELL
-        self.rect = self.image.get_rect(topleft=(x, y))
+        # a quarter turn clockwise on screen maps the distance (x, y) to (-y, x)
+        return Position(pivot.x - (self.pos.y - pivot.y), pivot.y + (self.pos.x - pivot.x))
@@ -2,14 +2,28 @@
 This is the timer module, it is responsible the in-game timers (fall speed, rotation, side to side movement)
 """
 
-import pygame as pg
+
+def pygame_clock() -> ():
+    """
+    :return: pg.time.get_ticks, milliseconds since pygame.init(). pygame is only imported when the clock is asked for,
+    so timers given another clock work without it.
+    """
+    import pygame as pg
+    return pg.time.get_ticks
 
 
 class Timer:
     """
     Class representing a timer.
     """
-    def __init__(self, dur: int, repeat: bool = False, function: () = None):
+    def __init__(self, dur: int, repeat: bool = False, function: () = None, get_ticks: () = None):
+        """
+        :param dur: duration in milliseconds
+        :param repeat: restart the timer when it runs out
+        :param function: function called when the timer runs out
+        :param get_ticks: clock returning the current time in milliseconds (default pygame clock)
+        """
+        self.get_ticks = get_ticks or pygame_clock()
         self.repeat = repeat
         self.function = function
         self.duration = dur
@@ -22,7 +36,7 @@ class Timer:
         Activate timer
         """
         self.active = True
-        self.start_time = pg.time.get_ticks()
+        self.start_time = self.get_ticks()
 
     def deactivate(self):
         """
@@ -35,7 +49,7 @@ class Timer:
         """
         Update timer
         """
-        cur_time = pg.time.get_ticks()
+        cur_time = self.get_ticks()
         if cur_time - self.start_time >= self.duration and self.active:
             if self.function is not None and self.start_time != 0:
                 self.function()
@@ -46,3 +60,29 @@ class Timer:
             # repeat timer
             if self.repeat:
                 self.activate()
+
+
+class FrameClock:
+    """
+    Clock that advances by a fixed time every frame, so a game plays the same at any frame rate
+    """
+    def __init__(self, frame_ms: int):
+        """
+        :param frame_ms: milliseconds added by every frame
+        """
+        self.frame_ms = frame_ms
+
+        # timers ignore a start time of 0
+        self.time = 1
+
+    def tick(self):
+        """
+        Advance the clock by one frame
+        """
+        self.time += self.frame_ms
+
+    def __call__(self) -> int:
+        """
+        :return: current time in milliseconds
+        """
+        return self.time
@@ -0,0 +1,117 @@
+"""
+This is the client module, it keeps a local copy of a board streamed by the game server
+"""
+
+import asyncio
+from argparse import ArgumentParser
+from random import Random
+
+from Network.protocol import (
+    PLAYER, SPECTATOR, FRAME, INPUT_KEYS, frame, encode_hello, encode_input, decode_update
+)
+from Network.server import GameServer
+
+
+class GameClient:
+    """
+    Client that joins a game as player or spectator and applies the board updates it receives
+    """
+    def __init__(self, role: int = SPECTATOR, game_id: int = 0):
+        """
+        :param role: PLAYER or SPECTATOR
+        :param game_id: index of the game to join
+        """
+        self.role = role
+        self.game_id = game_id
+        self.rows = []
+        self.state = {}
+        self.updates = 0
+        self.snapshots = 0
+        self.reader = None
+        self.writer = None
+
+    async def connect(self, host: str, port: int):
+        """
+        Connect to the server and join the game
+        :param host: server address
+        :param port: server port
+        """
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.writer.write(frame(encode_hello(self.role, self.game_id)))
+        await self.writer.drain()
+
+    async def send_input(self, keys: set[int]):
+        """
+        Send the keys held down by the player
+        :param keys: pygame key constants
+        """
+        self.writer.write(frame(encode_input(keys)))
+        await self.writer.drain()
+
+    async def receive_loop(self):
+        """
+        Apply updates from the server until the connection is closed
+        """
+        try:
+            while True:
+                length, = FRAME.unpack(await self.reader.readexactly(FRAME.size))
+                self.state = decode_update(await self.reader.readexactly(length), self.rows)
+                self.updates += 1
+                self.snapshots += self.state['kind'] == b'S'
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    def close(self):
+        """
+        Close the connection
+        """
+        self.writer.close()
+
+
+async def loopback(spectators: int = 100, seconds: float = 3.0):
+    """
+    Run a server and clients in this process, play random input and check every client mirrors the server board
+    :param spectators: number of spectator connections
+    :param seconds: how long to play
+    """
+    server = GameServer()
+    port = await server.start()
+
+    player = GameClient(PLAYER)
+    clients = [player] + [GameClient(SPECTATOR) for _ in range(spectators)]
+    for client in clients:
+        await client.connect('127.0.0.1', port)
+    tasks = [asyncio.create_task(client.receive_loop()) for client in clients]
+
+    random = Random(0)
+    loop = asyncio.get_running_loop()
+    end = loop.time() + seconds
+    while loop.time() < end:
+        await player.send_input({key for key in INPUT_KEYS[:5] if random.random() < 0.2})
+        await asyncio.sleep(0.1)
+
+    # stop ticking and let the queued updates arrive
+    server.stop()
+    await asyncio.sleep(0.5)
+
+    session = server.sessions[0]
+    in_sync = sum(client.rows == [bytearray(row) for row in session.rows] for client in clients)
+    print(f'{in_sync}/{len(clients)} clients in sync after {session.tick} ticks, '
+          f'{sum(client.updates for client in clients)} updates, '
+          f'{sum(client.snapshots for client in clients)} snapshots')
+
+    for client, task in zip(clients, tasks):
+        client.close()
+        task.cancel()
+
+    # let the server close its side of the connections
+    await asyncio.sleep(0.1)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description='Tetris loopback client')
+    parser.add_argument('--spectators', type=int, default=100)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    asyncio.run(loopback(args.spectators, args.seconds))
@@ -0,0 +1,141 @@
+"""
+This is the protocol module, it encodes the messages exchanged between the game server and its clients.
+
+Every message is sent as a frame: a little endian uint32 length followed by the payload.
+Board updates only carry the rows that changed since the previous update, each row as a bitmask of filled cells
+followed by one colour byte per filled cell, plus the position of the falling tetromino.
+"""
+
+import struct
+
+from settings import COLOURS, TETROMINOS, K_LEFT, K_RIGHT, K_UP, K_DOWN, K_SPACE, K_ESCAPE
+
+# message types
+HELLO = b'H'
+INPUT = b'I'
+SNAPSHOT = b'S'
+DELTA = b'D'
+
+# client roles
+PLAYER = 0
+SPECTATOR = 1
+
+# colour and shape codes, 0 means empty
+COLOUR_CODES = {colour: i + 1 for i, colour in enumerate(COLOURS)}
+SHAPES = list(TETROMINOS.keys())
+
+# keys that can be sent by a player, one bit each
+INPUT_KEYS = [K_LEFT, K_RIGHT, K_UP, K_DOWN, K_SPACE, K_ESCAPE]
+
+FRAME = struct.Struct('<I')
+HELLO_MSG = struct.Struct('<cBH')  # type, role, game id
+INPUT_MSG = struct.Struct('<cB')  # type, key bitmask
+UPDATE = struct.Struct('<cIHHIIIH')  # type, tick, columns, rows, level, score, lines, number of rows
+ROW = struct.Struct('<H')  # row index
+PIECE = struct.Struct('<B8h')  # shape code, (x, y) of the four blocks
+
+
+def frame(payload: bytes) -> bytes:
+    """
+    :param payload: message
+    :return: message prefixed with its length
+    """
+    return FRAME.pack(len(payload)) + payload
+
+
+def encode_hello(role: int, game_id: int) -> bytes:
+    """
+    :param role: PLAYER or SPECTATOR
+    :param game_id: index of the game to join
+    :return: hello message
+    """
+    return HELLO_MSG.pack(HELLO, role, game_id)
+
+
+def encode_input(keys: set[int]) -> bytes:
+    """
+    :param keys: pygame key constants held down by the player
+    :return: input message
+    """
+    mask = sum(1 << i for i, key in enumerate(INPUT_KEYS) if key in keys)
+    return INPUT_MSG.pack(INPUT, mask)
+
+
+def decode_input(message: bytes) -> set[int]:
+    """
+    :param message: input message
+    :return: pygame key constants held down by the player
+    """
+    _, mask = INPUT_MSG.unpack(message)
+    return {key for i, key in enumerate(INPUT_KEYS) if mask >> i & 1}
+
+
+def board_rows(game_area: list[list]) -> list[bytes]:
+    """
+    :param game_area: the game area of a game
+    :return: one byte string per row with the colour code of every cell
+    """
+    return [bytes(COLOUR_CODES[block.colour] if block else 0 for block in row) for row in game_area]
+
+
+def encode_row(index: int, row: bytes) -> bytes:
+    """
+    :param index: index of the row
+    :param row: colour code of every cell
+    :return: row index, bitmask of filled cells and the colour codes of the filled cells
+    """
+    mask = sum(1 << x for x, colour in enumerate(row) if colour)
+    return ROW.pack(index) + mask.to_bytes((len(row) + 7) // 8, 'little') + bytes(colour for colour in row if colour)
+
+
+def encode_update(kind: bytes, tick: int, rows: list[bytes], changed: list[int], score_data: list[int],
+                  shape: str, blocks: list[tuple[int, int]]) -> bytes:
+    """
+    Encode a board update
+    :param kind: SNAPSHOT or DELTA
+    :param tick: server tick of the update
+    :param rows: colour codes of all rows of the board
+    :param changed: indices of the rows to send
+    :param score_data: level, score and lines
+    :param shape: shape of the falling tetromino, None if there is none
+    :param blocks: (x, y) position of the blocks of the falling tetromino
+    :return: update message
+    """
+    header = UPDATE.pack(kind, tick, len(rows[0]), len(rows), *score_data, len(changed))
+    piece = PIECE.pack(SHAPES.index(shape) + 1 if shape else 0, *(value for block in blocks for value in block))
+    return b''.join([header, *(encode_row(i, rows[i]) for i in changed), piece])
+
+
+def decode_update(message: bytes, rows: list[bytearray]) -> dict:
+    """
+    Apply a board update to a local copy of the board
+    :param message: update message
+    :param rows: local board, replaced entirely by snapshots
+    :return: dict with the tick, score data and falling tetromino of the update
+    """
+    kind, tick, columns, num_rows, level, score, lines, count = UPDATE.unpack_from(message)
+    if kind == SNAPSHOT:
+        rows[:] = [bytearray(columns) for _ in range(num_rows)]
+
+    offset = UPDATE.size
+    mask_size = (columns + 7) // 8
+    for _ in range(count):
+        index, = ROW.unpack_from(message, offset)
+        mask = int.from_bytes(message[offset + ROW.size:offset + ROW.size + mask_size], 'little')
+        offset += ROW.size + mask_size
+
+        row = bytearray(columns)
+        for x in range(columns):
+            if mask >> x & 1:
+                row[x] = message[offset]
+                offset += 1
+        rows[index] = row
+
+    shape, *positions = PIECE.unpack_from(message, offset)
+    return {
+        'kind': kind,
+        'tick': tick,
+        'score_data': [level, score, lines],
+        'shape': SHAPES[shape - 1] if shape else None,
+        'blocks': list(zip(positions[::2], positions[1::2]))
+    }
@@ -0,0 +1,236 @@
+"""
+This is the server module, it runs the authoritative games and streams board updates to players and spectators
+"""
+
+import asyncio
+import struct
+from argparse import ArgumentParser
+from time import monotonic
+
+from settings import K_SPACE
+from Game_Logic.board import Board
+from Game_Logic.controls import ScriptedKeys
+from Network.protocol import (
+    HELLO_MSG, INPUT_MSG, INPUT, PLAYER, SNAPSHOT, DELTA, FRAME, frame, decode_input, board_rows, encode_update
+)
+
+
+def ticks() -> int:
+    """
+    Clock of the games, they are simulated without pygame
+    :return: current time in milliseconds
+    """
+    return int(monotonic() * 1000)
+
+
+class Session:
+    """
+    An authoritative game and the clients connected to it
+    """
+    def __init__(self, seed: int = None):
+        self.keys = ScriptedKeys()
+        self.input = set()
+        self.board = Board(seed, self.keys, get_ticks=ticks)
+        self.clients = set()
+
+        self.tick = 0
+        self.rows = board_rows(self.board.game.game_area)
+        self.revision = None
+        self.key = None
+        self.cached_snapshot = (None, b'')
+
+    def piece(self) -> tuple[str, list[tuple[int, int]]]:
+        """
+        :return: shape and block positions of the falling tetromino
+        """
+        game = self.board.game
+        if game.bools['game_over']:
+            return None, [(0, 0)] * 4
+        return game.tetromino.shape, [(int(block.pos.x), int(block.pos.y)) for block in game.tetromino.blocks]
+
+    def snapshot(self) -> bytes:
+        """
+        :return: framed snapshot of the whole board, encoded at most once per tick
+        """
+        if self.cached_snapshot[0] != self.tick:
+            self.cached_snapshot = (self.tick, frame(encode_update(
+                SNAPSHOT, self.tick, self.rows, list(range(len(self.rows))), self.board.score_data, *self.piece())))
+        return self.cached_snapshot[1]
+
+    def step(self) -> bytes:
+        """
+        Advance the game by one tick
+        :return: framed delta with the rows that changed, None if nothing visible changed
+        """
+        self.tick += 1
+
+        # the input is pressed again every tick so that released keys only last for one tick
+        self.keys.press(self.input)
+        if self.board.game.bools['game_over'] and self.keys.get_just_released()[K_SPACE]:
+            self.board.restart()
+            self.revision = None
+        self.board.game.update()
+
+        key = (self.board.game.board_key(), tuple(self.board.score_data))
+        if key == self.key:
+            return None
+        self.key = key
+
+        # rows can only change when a tetromino is locked
+        changed = []
+        if self.board.game.revision != self.revision:
+            self.revision = self.board.game.revision
+            rows = board_rows(self.board.game.game_area)
+            changed = [i for i, row in enumerate(rows) if row != self.rows[i]]
+            self.rows = rows
+
+        return frame(encode_update(DELTA, self.tick, self.rows, changed, self.board.score_data, *self.piece()))
+
+
+class Client:
+    """
+    A connected client with a bounded queue of outgoing messages
+    """
+    def __init__(self, writer: asyncio.StreamWriter, queue_size: int):
+        self.writer = writer
+        self.queue = asyncio.Queue(queue_size)
+
+    def send(self, message: bytes, session: Session):
+        """
+        Queue a delta. If the client is too slow to keep up its queue is replaced by the latest snapshot.
+        :param message: framed delta
+        :param session: session the delta belongs to
+        """
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            message = session.snapshot()
+        self.queue.put_nowait(message)
+
+    async def send_loop(self):
+        """
+        Write queued messages to the socket
+        """
+        while True:
+            message = await self.queue.get()
+            self.writer.write(message)
+            await self.writer.drain()
+
+
+class GameServer:
+    """
+    Asyncio server that owns the games, applies player input and broadcasts board deltas every tick
+    """
+    def __init__(self, games: int = 1, tick_rate: int = 60, queue_size: int = 8):
+        """
+        :param games: number of games hosted
+        :param tick_rate: game updates per second
+        :param queue_size: maximum number of messages queued per client
+        """
+        self.sessions = [Session(seed) for seed in range(games)]
+        self.tick_rate = tick_rate
+        self.queue_size = queue_size
+        self.server = None
+        self.ticker = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> int:
+        """
+        Start listening and ticking the games
+        :param host: address to listen on
+        :param port: port to listen on, 0 picks a free port
+        :return: port the server is listening on
+        """
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        self.ticker = asyncio.get_running_loop().create_task(self.tick_loop())
+        return self.server.sockets[0].getsockname()[1]
+
+    def stop(self):
+        """
+        Stop ticking the games and accepting connections, queued updates are still sent
+        """
+        self.ticker.cancel()
+        self.server.close()
+
+    async def tick_loop(self):
+        """
+        Update every game at the tick rate and broadcast the changes
+        """
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            for session in self.sessions:
+                message = session.step()
+                if message is not None:
+                    for client in session.clients:
+                        client.send(message, session)
+
+            next_tick += 1 / self.tick_rate
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Handle a connection: a hello message, then input messages from players
+        :param reader: stream the client messages are read from
+        :param writer: stream the updates are written to
+        """
+        client = Client(writer, self.queue_size)
+        session = None
+        sender = asyncio.get_running_loop().create_task(client.send_loop())
+        try:
+            _, role, game_id = HELLO_MSG.unpack(await self.read_message(reader))
+            session = self.sessions[game_id]
+            client.queue.put_nowait(session.snapshot())
+            session.clients.add(client)
+
+            while True:
+                message = await self.read_message(reader)
+                if role == PLAYER and message[:1] == INPUT:
+                    session.input = decode_input(message)
+        except (asyncio.IncompleteReadError, ConnectionError, IndexError, struct.error, ValueError):
+            # disconnected or malformed message
+            pass
+        finally:
+            if session is not None:
+                session.clients.discard(client)
+
+                # the game must not keep pressing the keys of a player that left
+                if role == PLAYER:
+                    session.input = set()
+            sender.cancel()
+            writer.close()
+
+    @staticmethod
+    async def read_message(reader: asyncio.StreamReader) -> bytes:
+        """
+        :param reader: stream to read from
+        :return: payload of the next frame
+        """
+        length, = FRAME.unpack(await reader.readexactly(FRAME.size))
+
+        # the length comes from the client, longer frames than any client message are not buffered
+        if length > max(HELLO_MSG.size, INPUT_MSG.size):
+            raise ValueError(f'frame of {length} bytes')
+        return await reader.readexactly(length)
+
+
+async def serve(host: str, port: int, games: int):
+    """
+    Run the server until interrupted
+    :param host: address to listen on
+    :param port: port to listen on
+    :param games: number of games hosted
+    """
+    server = GameServer(games)
+    port = await server.start(host, port)
+    print(f'serving {games} game(s) on {host}:{port}')
+    await server.server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description='Tetris game server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--games', type=int, default=1)
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.host, args.port, args.games))
@@ -2,26 +2,39 @@
 This is the score module responsible for calculating and rendering the score
 """
 
-from os import path
-from settings import pg, SIDEBAR_W, GAME_H, SCORE_H, PADDING, WINDOW_H, OUTLINE_COLOUR, BG_GAME_COLOUR
+import pygame as pg
+
+from settings import SIDEBAR_W, GAME_H, SCORE_H, PADDING, WINDOW_H, OUTLINE_COLOUR, BG_GAME_COLOUR
+from Game_Logic.atlas import font
+from Game_Logic.layout import Layout
 
 
 class Score:
     """
     Class to represent the game score (point count, lines, level)
     """
-    def __init__(self):
-        self.surface = pg.Surface((SIDEBAR_W, GAME_H * SCORE_H - PADDING))
-        self.rect = self.surface.get_rect(bottomleft=(PADDING, WINDOW_H - PADDING))
-        self.display = pg.display.get_surface()
-
-        self.surf_height = self.surface.get_height() // 3
+    def __init__(self, layout: Layout = None):
+        """
+        :param layout: layout of the window (default unscaled)
+        """
+        self.resize(layout or Layout())
 
         # initialize score, level and lines
         self.score_data = [1, 0, 0]  # level, score, lines
 
-        # load font
-        self.font = pg.font.Font(path.join('Assets', 'Silkscreen-Regular.ttf'), 25)
+    def resize(self, layout: Layout):
+        """
+        Lay out the score in a resized window
+        :param layout: layout of the window
+        """
+        self.surface = pg.Surface((layout.px(SIDEBAR_W), layout.px(GAME_H * SCORE_H - PADDING)))
+        self.rect = self.surface.get_rect(bottomleft=layout.point(PADDING, WINDOW_H - PADDING))
+        self.display = pg.display.get_surface()
+
+        self.surf_height = self.surface.get_height() // 3
+
+        # font size, the font is loaded on first use
+        self.font_size = layout.px(25)
 
     def display_text(self, pos: tuple[float, float], text: tuple[str, int]):
         """
@@ -29,7 +42,7 @@ class Score:
         :param pos: position where the text should be rendered
         :param text: text to be rendered
         """
-        text_surface = self.font.render(f'{text[0]}\n{text[1]}', False, OUTLINE_COLOUR)
+        text_surface = font(self.font_size).render(f'{text[0]}\n{text[1]}', False, OUTLINE_COLOUR)
         text_rect = text_surface.get_rect(center=pos)
         self.surface.blit(text_surface, text_rect)
 
@@ -2,30 +2,38 @@
 This is the sidebar module, it's responsible for showing the list of next tetrominos to be spawned
 """
 
-from os import path
-from settings import (
-    pg, SIDEBAR_W, GAME_H, PREVIEW_H, WINDOW_W, PADDING, TETROMINOS, BG_GAME_COLOUR, OUTLINE_COLOUR
-)
+import pygame as pg
+
+from settings import SIDEBAR_W, GAME_H, PREVIEW_H, WINDOW_W, PADDING, BG_GAME_COLOUR, OUTLINE_COLOUR
+from Game_Logic.atlas import font, image
+from Game_Logic.layout import Layout
 
 
 class Sidebar:
     """
     Class to render the list of next shapes on the sidebar
     """
-    def __init__(self):
-        self.display = pg.display.get_surface()
-        self.surface = pg.Surface((SIDEBAR_W, GAME_H * PREVIEW_H))
-        self.rect = self.surface.get_rect(topright=(WINDOW_W - PADDING, PADDING))
+    def __init__(self, layout: Layout = None):
+        """
+        :param layout: layout of the window (default unscaled)
+        """
+        self.resize(layout or Layout())
 
-        # load shape images
-        self.shape_surf = {shape: pg.image.load(path.join('Assets', 'Next_Shape', f'{shape}.png')).convert_alpha() for
-                           shape in TETROMINOS}
+    def resize(self, layout: Layout):
+        """
+        Lay out the sidebar in a resized window
+        :param layout: layout of the window
+        """
+        self.layout = layout
+        self.display = pg.display.get_surface()
+        self.surface = pg.Surface((layout.px(SIDEBAR_W), layout.px(GAME_H * PREVIEW_H)))
+        self.rect = self.surface.get_rect(topright=layout.point(WINDOW_W - PADDING, PADDING))
 
         # calculate surface height
         self.surf_height = self.surface.get_height() // 3
 
-        # load font
-        self.font = pg.font.Font(path.join('Assets', 'Silkscreen-Regular.ttf'), 25)
+        # font size, the font is loaded on first use
+        self.font_size = layout.px(25)
 
     def pieces(self, shapes: list[str]):
         """
@@ -33,25 +41,27 @@ class Sidebar:
         :param shapes: list of next tetromino pieces
         """
         for i, shape in enumerate(shapes):
-            shape_surf = self.shape_surf[shape]
+            name = f'Next_Shape/{shape}.png'
+            shape_surf = image(name)
 
             # scale images to correct size
             if shape in ('J', 'L'):
-                new_width = int(shape_surf.get_width() * 0.20)
-                new_height = int(shape_surf.get_height() * 0.20)
+                new_width = int(shape_surf.get_width() * 0.20 * self.layout.scale)
+                new_height = int(shape_surf.get_height() * 0.20 * self.layout.scale)
             elif shape == 'I':
-                new_width = int(shape_surf.get_width() * 0.25)
-                new_height = int(shape_surf.get_height() * 0.25)
+                new_width = int(shape_surf.get_width() * 0.25 * self.layout.scale)
+                new_height = int(shape_surf.get_height() * 0.25 * self.layout.scale)
             else:
-                new_width = int(shape_surf.get_width() * 0.15)
-                new_height = int(shape_surf.get_height() * 0.15)
+                new_width = int(shape_surf.get_width() * 0.15 * self.layout.scale)
+                new_height = int(shape_surf.get_height() * 0.15 * self.layout.scale)
 
-            shape_surf = pg.transform.scale(shape_surf, (new_width, new_height))
+            # scaled images are cached once per scale
+            shape_surf = image(name, (new_width, new_height))
 
             # calculate correct position and render tetromino
             x = self.surface.get_width() // 2
             y = self.surf_height // 2 + i * self.surf_height
-            rect = shape_surf.get_rect(center=(x, y + 20))
+            rect = shape_surf.get_rect(center=(x, y + self.layout.px(20)))
             self.surface.blit(shape_surf, rect)
 
     def sidebar_loop(self, next_shape: list[str]):
@@ -62,8 +72,8 @@ class Sidebar:
         self.surface.fill(BG_GAME_COLOUR)
 
         # write text
-        text_surface = self.font.render("Next", False, OUTLINE_COLOUR)
-        text_rect = text_surface.get_rect(midtop=(self.surface.get_width() // 2, 10))
+        text_surface = font(self.font_size).render("Next", False, OUTLINE_COLOUR)
+        text_rect = text_surface.get_rect(midtop=(self.surface.get_width() // 2, self.layout.px(10)))
         self.surface.blit(text_surface, text_rect)
 
         # show next 3 pieces
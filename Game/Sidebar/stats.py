@@ -0,0 +1,56 @@
+"""
+This is the stats module responsible for rendering the live telemetry of the game
+"""
+
+import pygame as pg
+
+from settings import SIDEBAR_W, PADDING, WINDOW_W, WINDOW_H, OUTLINE_COLOUR, BG_GAME_COLOUR
+from Game_Logic.atlas import font
+from Game_Logic.layout import Layout
+from Game_Logic.telemetry import Telemetry
+
+
+class Stats:
+    """
+    Class to render pieces per second, actions per minute, lock latency and stack height in place of the controls
+    """
+    def __init__(self, layout: Layout = None):
+        """
+        :param layout: layout of the window (default unscaled)
+        """
+        self.resize(layout or Layout())
+
+    def resize(self, layout: Layout):
+        """
+        Lay out the stats in a resized window
+        :param layout: layout of the window
+        """
+        self.layout = layout
+        self.surface = pg.Surface((layout.px(SIDEBAR_W), layout.px(SIDEBAR_W)))
+        self.rect = self.surface.get_rect(bottomright=layout.point(WINDOW_W - PADDING, WINDOW_H - PADDING))
+        self.display = pg.display.get_surface()
+
+        # font sizes, the font is loaded on first use
+        self.font_sizes = [layout.px(25), layout.px(19)]
+
+    def stats_loop(self, telemetry: Telemetry):
+        """
+        Stats loop responsible for rendering the stats
+        :param telemetry: telemetry of the current game
+        """
+        self.surface.fill(BG_GAME_COLOUR)
+
+        # write title
+        text_surface = font(self.font_sizes[0]).render("Stats", False, OUTLINE_COLOUR)
+        text_rect = text_surface.get_rect(midtop=(self.surface.get_width() // 2, self.layout.px(10)))
+        self.surface.blit(text_surface, text_rect)
+
+        texts = [f'PPS {telemetry.pps():.2f}', f'APM {telemetry.apm():.0f}', f'Lock {telemetry.latency():.2f}ms',
+                 f'Height {telemetry.height()}/{telemetry.max_height}']
+        for i, text in enumerate(texts):
+            text_surface = font(self.font_sizes[1]).render(text, False, OUTLINE_COLOUR)
+            text_rect = text_surface.get_rect(topleft=(self.layout.px(15), self.layout.px(55 + i * 35)))
+            self.surface.blit(text_surface, text_rect)
+
+        self.display.blit(self.surface, self.rect)
+        pg.draw.rect(self.display, OUTLINE_COLOUR, self.rect, 2, 5)
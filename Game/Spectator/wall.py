@@ -0,0 +1,101 @@
+"""
+This is the wall module, it renders many games in one window for spectating
+"""
+
+from math import ceil
+
+import pygame as pg
+
+from settings import CELL, PADDING, BG_COLOUR, BG_GAME_COLOUR, OUTLINE_COLOUR
+from Game_Logic.atlas import block_texture, grid_overlay
+from Game_Logic.board import Board
+
+
+class SpectatorWall:
+    """
+    Tiles several boards in the window at a scaled cell size, boards may have different sizes.
+    Every board is cached on its own surface and only redrawn when its state changed.
+    """
+    def __init__(self, boards: list[Board], size: tuple[int, int]):
+        """
+        :param boards: boards to show
+        :param size: (width, height) of the area used for the wall
+        """
+        self.display = pg.display.get_surface()
+        self.boards = boards
+
+        # pick the number of wall columns that gives the biggest cells
+        self.cell, self.columns = max((self.tile_cell(size, columns), columns)
+                                      for columns in range(1, len(boards) + 1))
+        self.rows = ceil(len(boards) / self.columns)
+        tile_w = (size[0] - PADDING) // self.columns - PADDING
+        tile_h = (size[1] - PADDING) // self.rows - PADDING
+
+        # the grid overlay is cached, boards of the same size share one
+        self.grids = [grid_overlay(*board.board_size, self.cell) for board in boards]
+        self.surfaces = [pg.Surface((board.board_size[0] * self.cell, board.board_size[1] * self.cell))
+                         for board in boards]
+        self.rects = [surface.get_rect(center=(PADDING + (i % self.columns) * (tile_w + PADDING) + tile_w // 2,
+                                               PADDING + (i // self.columns) * (tile_h + PADDING) + tile_h // 2))
+                      for i, surface in enumerate(self.surfaces)]
+
+        # last drawn state of every board, None forces a redraw
+        self.keys = [None for _ in boards]
+
+    def tile_cell(self, size: tuple[int, int], columns: int) -> int:
+        """
+        Calculate the cell size when the boards are laid out in the given number of columns
+        :param size: (width, height) of the area used for the wall
+        :param columns: number of boards per row
+        :return: cell size in pixels
+        """
+        rows = ceil(len(self.boards) / columns)
+        tile_w = (size[0] - PADDING) // columns - PADDING
+        tile_h = (size[1] - PADDING) // rows - PADDING
+        # every board has to fit its tile
+        return max(1, min(CELL, *(min(tile_w // board.board_size[0], tile_h // board.board_size[1])
+                                  for board in self.boards)))
+
+    def draw_board(self, index: int):
+        """
+        Draw the locked blocks and the falling tetromino of a board onto its surface
+        :param index: index of the board
+        """
+        game = self.boards[index].game
+        surface = self.surfaces[index]
+        surface.fill(BG_GAME_COLOUR)
+
+        blocks = [block for row in game.game_area for block in row if block]
+        if not game.bools['game_over']:
+            blocks += game.tetromino.blocks
+
+        surface.fblits([(block_texture(block.colour, self.cell), (block.pos.x * self.cell, block.pos.y * self.cell))
+                        for block in blocks if block.pos.y >= 0])
+        surface.blit(self.grids[index], (0, 0))
+
+    def wall_loop(self) -> list[pg.Rect]:
+        """
+        Update every board and redraw the ones that changed
+        :return: rects of the window that have been redrawn
+        """
+        dirty = []
+        for i, board in enumerate(self.boards):
+            if board.game.bools['game_over']:
+                board.restart()
+            board.game.update()
+
+            key = board.game.board_key()
+            if key != self.keys[i]:
+                self.keys[i] = key
+                self.draw_board(i)
+                self.display.blit(self.surfaces[i], self.rects[i])
+                pg.draw.rect(self.display, OUTLINE_COLOUR, self.rects[i].inflate(4, 4), 2, 3)
+                dirty.append(self.rects[i].inflate(4, 4))
+        return dirty
+
+    def redraw(self):
+        """
+        Force every board to be redrawn on the next frame
+        """
+        self.display.fill(BG_COLOUR)
+        self.keys = [None for _ in self.boards]
@@ -1,13 +1,25 @@
 """
 This is the main module of the Tetris game responsible for running and rendering the whole application
 """
+from time import perf_counter
+
+START_TIME = perf_counter()
+
 import sys
+import os
+from argparse import ArgumentParser
 from random import choice
-from os import path
+
+import pygame as pg
 
 # components
-from settings import pg, WINDOW_W, WINDOW_H, TETROMINOS, SIDEBAR_W, PADDING, BG_COLOUR, OUTLINE_COLOUR
+from settings import (
+    WINDOW_W, WINDOW_H, COLUMNS, ROWS, TETROMINOS, SIDEBAR_W, PADDING, BG_COLOUR, OUTLINE_COLOUR
+)
 from Game_Logic.game import Game
+from Game_Logic.atlas import font, image
+from Game_Logic.layout import Layout
+from Game_Logic.timer import FrameClock
 from Sidebar.score import Score
 from Sidebar.sidebar import Sidebar
 
@@ -17,13 +29,39 @@ class App:
     The main application class for the Tetris game.
     This class initializes the game, manages the game loop, and renders all components
     """
-    def __init__(self):
+    def __init__(self, headless: bool = False, hints: str = None, practice: bool = False,
+                 board_size: tuple[int, int] = (COLUMNS, ROWS), stats: bool = False,
+                 window_size: tuple[int, int] = (WINDOW_W, WINDOW_H), resizable: bool = False, keys=None,
+                 get_ticks: () = None, frame_ms: int = 0):
         """
         Initialize the game application
         This method sets up the game window, initializes components, and loads assets
+        :param headless: render to an off-screen surface without opening a window
+        :param hints: solver mode used to show placement hints ('score' or 'perfect'), None disables hints
+        :param practice: allow undoing tetrominos with backspace
+        :param board_size: (columns, rows) of the board
+        :param stats: show the live telemetry of the game in place of the controls
+        :param window_size: (width, height) of the window, the layout is scaled to fit it
+        :param resizable: let the user resize the window
+        :param keys: input source with get_pressed() and get_just_released() like pg.key (default keyboard), e.g.
+                     ScriptedKeys to let an agent play
+        :param get_ticks: clock of the games returning the current time in milliseconds (default pygame clock)
+        :param frame_ms: if set, the games run on a clock that advances by frame_ms every frame instead of get_ticks,
+                         so every frame plays the same however fast frames are rendered
         """
+        self.headless = headless
+        self.practice = practice
+        self.board_size = board_size
+        self.keys = keys if keys is not None else pg.key
+        self.frame_clock = FrameClock(frame_ms) if frame_ms else None
+        self.get_ticks = self.frame_clock or get_ticks
+        if headless:
+            # the dummy driver keeps the display surface in memory only
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
         pg.init()
-        self.screen = pg.display.set_mode((WINDOW_W, WINDOW_H))
+        self.screen = pg.display.set_mode(window_size, pg.RESIZABLE if resizable else 0)
+        self.layout = Layout(window_size)
         self.clock = pg.time.Clock()
         pg.display.set_caption('Pygame Tetris Clone')
 
@@ -32,24 +70,110 @@ class App:
 
         # initialize components
         self.components = {
-            'game': Game(self.get_next, self.update_score),
-            'score': Score(),
-            'sidebar': Sidebar()
+            'game': self.new_game(),
+            'score': Score(self.layout),
+            'sidebar': Sidebar(self.layout)
         }
+        if stats:
+            # the stats panel is only imported when it is shown
+            from Sidebar.stats import Stats
+            self.components['stats'] = Stats(self.layout)
 
-        # load and scale controls image
-        self.controls_image = pg.image.load(path.join('Assets', 'Controls.png')).convert_alpha()
-        self.controls_image = pg.transform.scale(self.controls_image, (SIDEBAR_W, SIDEBAR_W))
-
-        # load fonts
-        self.fonts = {
-            'default': pg.font.Font(path.join('Assets', 'Silkscreen-Regular.ttf'), 25),
-            'logo': pg.font.Font(path.join('Assets', 'Silkscreen-Regular.ttf'), 55),
-            'name': pg.font.Font(path.join('Assets', 'Silkscreen-Regular.ttf'), 19)
+        # font sizes, fonts and images are loaded on first use
+        self.font_sizes = {
+            'default': 25,
+            'logo': 55,
+            'name': 19
         }
 
         self.high_score = self.read_high_score()
 
+        # seconds from the start of the process to the first rendered frame
+        self.first_frame_time = None
+
+        # frame buffers for pixel observations ('game' and/or 'window') and the step they were recorded with
+        self.frame_buffers = {}
+        self.frame_steps = {}
+
+        # solver running in a worker process, the hint is requested again for every new tetromino
+        self.hint_worker = None
+        if hints:
+            # the solver is only imported when hints are enabled
+            from Analysis.hints import HintWorker
+            self.hint_worker = HintWorker(hints)
+        self.hint_request = (None, None)  # (game revision, request id)
+
+    def new_game(self) -> Game:
+        """
+        :return: a new game with the board size, mode and clock of the application, headless games do not save the
+                 high score and the telemetry
+        """
+        return Game(self.get_next, self.update_score, self.keys, save_high_score=not self.headless,
+                    practice=self.practice, columns=self.board_size[0], rows=self.board_size[1],
+                    save_telemetry=not self.headless, layout=self.layout, get_ticks=self.get_ticks)
+
+    def resize(self, size: tuple[int, int]):
+        """
+        Lay out every component again after the window has been resized
+        :param size: (width, height) of the window
+        """
+        self.screen = pg.display.get_surface()
+        self.layout = Layout(size)
+        for component in self.components.values():
+            component.resize(self.layout)
+
+        # captured frames keep the size they had, the buffers start again at the new size
+        for target, frame_buffer in list(self.frame_buffers.items()):
+            self.record(target, frame_buffer.capacity, self.frame_steps[target])
+
+    def record(self, target: str = 'game', capacity: int = 64, step: int = 1):
+        """
+        Start capturing every rendered frame of the game area or of the whole window
+        :param target: 'game' for the game area or 'window' for the whole window
+        :param capacity: number of frames kept in the ring buffer
+        :param step: downsampling step in pixels, None keeps one pixel per cell of the game area at any window size and
+                     board size
+        :return: the frame buffer the frames are written to
+        """
+        # numpy is only imported when frames are captured
+        from Game_Logic.observation import FrameBuffer
+
+        size = self.components['game'].surface.get_size() if target == 'game' else self.screen.get_size()
+        self.frame_steps[target] = step
+        self.frame_buffers[target] = FrameBuffer(size, capacity, step or self.components['game'].cell)
+        return self.frame_buffers[target]
+
+    def capture_frames(self):
+        """
+        Copy the current frame into the active frame buffers
+        """
+        surfaces = {'game': self.components['game'].surface, 'window': self.screen}
+        for target, frame_buffer in self.frame_buffers.items():
+            frame_buffer.capture(surfaces[target])
+
+    def close(self):
+        """
+        Stop the hint worker and quit pygame
+        """
+        if self.hint_worker:
+            self.hint_worker.close()
+        pg.quit()
+
+    def update_hint(self):
+        """
+        Request a hint for every new tetromino and show the answer once the worker has found it
+        """
+        game = self.components['game']
+        if self.hint_request[0] != game.revision:
+            game.hint = None
+            request_id = self.hint_worker.submit(game.game_area, [game.tetromino.shape] + self.next_shape,
+                                                 game.score_data['lines'])
+            self.hint_request = (game.revision, request_id)
+
+        result = self.hint_worker.poll()
+        if result is not None and result[0] == self.hint_request[1] and result[2]:
+            game.hint = result[2][0][1]
+
     def get_next(self) -> str:
         """
         Get next tetromino in the sequence
@@ -74,13 +198,15 @@ class App:
         """
         Render controls image in the bottom right corner of the window
         """
-        controls_text = self.fonts['default'].render("Controls", False, OUTLINE_COLOUR)
+        # the image is scaled once per layout scale
+        controls_image = image('Controls.png', (self.layout.px(SIDEBAR_W), self.layout.px(SIDEBAR_W)))
+        controls_text = font(self.layout.px(self.font_sizes['default'])).render("Controls", False, OUTLINE_COLOUR)
         controls_text_rect = controls_text.get_rect(
-            midbottom=(WINDOW_W - PADDING - SIDEBAR_W // 2, WINDOW_H - PADDING - self.controls_image.get_height() - 10))
+            midbottom=self.layout.point(WINDOW_W - PADDING - SIDEBAR_W // 2, WINDOW_H - PADDING - SIDEBAR_W - 10))
         self.screen.blit(controls_text, controls_text_rect)
 
-        controls_rect = self.controls_image.get_rect(bottomright=(WINDOW_W - PADDING, WINDOW_H - PADDING))
-        self.screen.blit(self.controls_image, controls_rect)
+        controls_rect = controls_image.get_rect(bottomright=self.layout.point(WINDOW_W - PADDING, WINDOW_H - PADDING))
+        self.screen.blit(controls_image, controls_rect)
 
     def read_high_score(self) -> str:
         """
@@ -101,52 +227,140 @@ class App:
         Render logo, my name and the high score
         """
         texts = ["Tetris", "skibidi", f"High Score\n{self.high_score}"]
-        text_positions = [(PADDING - 5, PADDING), (PADDING, PADDING + 60), (PADDING, PADDING + 250)]
-        fonts = [self.fonts['logo'], self.fonts['name'], self.fonts['default']]
+        text_positions = [self.layout.point(PADDING - 5, PADDING), self.layout.point(PADDING, PADDING + 60),
+                          self.layout.point(PADDING, PADDING + 250)]
+        fonts = [font(self.layout.px(self.font_sizes[name])) for name in ('logo', 'name', 'default')]
 
-        for text, pos, font in zip(texts, text_positions, fonts):
-            text_surface = font.render(text, False, OUTLINE_COLOUR)
+        for text, pos, font_1 in zip(texts, text_positions, fonts):
+            text_surface = font_1.render(text, False, OUTLINE_COLOUR)
             text_rect = text_surface.get_rect(topleft=pos)
             self.screen.blit(text_surface, text_rect)
 
-    def main_game_loop(self):
+    def main_game_loop(self, frames: int = 0):
         """
         Run the main game loop
         The game loop continuously updates and renders the app components until the user exits
+        :param frames: number of frames to run before returning, 0 runs until the user exits
         """
-        while True:
+        frame = 0
+        while not frames or frame < frames:
+            frame += 1
+            if self.frame_clock:
+                self.frame_clock.tick()
+
             for event in pg.event.get():
                 if event.type == pg.QUIT:
-                    pg.quit()
+                    self.close()
                     sys.exit()
+                if event.type == pg.VIDEORESIZE:
+                    self.resize(event.size)
+
+            if self.hint_worker and not self.components['game'].bools['game_over']:
+                self.update_hint()
 
-            self.screen.fill(BG_COLOUR)
+            if self.headless and 'window' not in self.frame_buffers:
+                # nobody sees the window, only the game area is rendered
+                self.components['game'].update()
+                self.components['game'].render()
+            else:
+                self.screen.fill(BG_COLOUR)
 
-            # render game
-            self.components['game'].game_loop()
-            self.components['score'].score_loop()
-            self.components['sidebar'].sidebar_loop(self.next_shape)
+                # render game
+                self.components['game'].game_loop()
+                self.components['score'].score_loop()
+                self.components['sidebar'].sidebar_loop(self.next_shape)
 
-            # render controls
-            self.render_controls()
+                # render controls or stats
+                if 'stats' in self.components:
+                    self.components['stats'].stats_loop(self.components['game'].telemetry)
+                else:
+                    self.render_controls()
 
-            # render logo
-            self.render_logo()
+                # render logo
+                self.render_logo()
 
             # restart game after game over
-            if self.components['game'].bools['game_over'] and pg.key.get_just_released()[pg.K_SPACE]:
+            if self.components['game'].bools['game_over'] and self.keys.get_just_released()[pg.K_SPACE]:
                 # reinitialize values
                 self.next_shape = [choice(list(TETROMINOS.keys())) for shape in range(3)]
-                self.components['game'] = Game(self.get_next, self.update_score)
-                self.components['score'] = Score()
-                self.components['sidebar'] = Sidebar()
+                self.components['game'] = self.new_game()
+                self.components['score'] = Score(self.layout)
+                self.components['sidebar'] = Sidebar(self.layout)
                 self.high_score = self.read_high_score()
+                self.hint_request = (None, None)
+
+            # pixel observations
+            if self.frame_buffers:
+                self.capture_frames()
 
             # game tick
-            pg.display.update()
+            if not self.headless:
+                pg.display.update()
             self.clock.tick()
 
+            if self.first_frame_time is None:
+                self.first_frame_time = perf_counter() - START_TIME
+
+    def spectator_loop(self, count: int, frames: int = 0):
+        """
+        Run the spectator wall showing several games driven by random input
+        :param count: number of boards to show
+        :param frames: number of frames to run before returning, 0 runs until the user exits
+        """
+        # spectator components are only imported for the spectator wall
+        from Game_Logic.board import Board
+        from Spectator.wall import SpectatorWall
+
+        boards = [Board(seed, columns=self.board_size[0], rows=self.board_size[1]) for seed in range(count)]
+        wall = SpectatorWall(boards, self.screen.get_size())
+        wall.redraw()
+        pg.display.update()
+
+        frame = 0
+        while not frames or frame < frames:
+            frame += 1
+            for event in pg.event.get():
+                if event.type == pg.QUIT:
+                    self.close()
+                    sys.exit()
+                if event.type == pg.VIDEORESIZE:
+                    # tile the same boards in the resized window
+                    self.screen = pg.display.get_surface()
+                    wall = SpectatorWall(wall.boards, event.size)
+                    wall.redraw()
+
+            # only the boards that changed are sent to the window
+            dirty = wall.wall_loop()
+            if not self.headless:
+                pg.display.update(dirty)
+            self.clock.tick(0 if self.headless else 60)
+
 
 if __name__ == "__main__":
-    app = App()
-    app.main_game_loop()
+    parser = ArgumentParser(description='Pygame Tetris Clone')
+    parser.add_argument('--headless', action='store_true', help='render off-screen without opening a window')
+    parser.add_argument('--frames', type=int, default=0, help='number of frames to run (0 runs until exit)')
+    parser.add_argument('--frame-ms', type=int, default=0,
+                        help='advance the game clock by this many milliseconds every frame instead of real time')
+    parser.add_argument('--hints', choices=['score', 'perfect'], help='show solver hints for the falling tetromino')
+    parser.add_argument('--practice', action='store_true', help='allow undoing tetrominos with backspace')
+    parser.add_argument('--columns', type=int, default=COLUMNS, help='number of columns of the board')
+    parser.add_argument('--rows', type=int, default=ROWS, help='number of rows of the board, tall boards scroll')
+    parser.add_argument('--stats', action='store_true', help='show pieces per second, actions per minute and more')
+    parser.add_argument('--size', type=int, nargs=2, default=(WINDOW_W, WINDOW_H), metavar=('WIDTH', 'HEIGHT'),
+                        help='window size, the layout is scaled to fit')
+    parser.add_argument('--resizable', action='store_true', help='let the window be resized')
+    parser.add_argument('--spectate', type=int, default=0, help='show a wall of N games played by random input')
+    args = parser.parse_args()
+
+    app = App(args.headless, args.hints, args.practice, (args.columns, args.rows), args.stats, tuple(args.size),
+              args.resizable, frame_ms=args.frame_ms)
+    if args.spectate:
+        app.spectator_loop(args.spectate, args.frames)
+    else:
+        app.main_game_loop(args.frames)
+    if args.headless:
+        print(f'{args.frames} frames at {app.clock.get_fps():.0f} fps')
+        if app.first_frame_time is not None:
+            print(f'first frame after {app.first_frame_time * 1000:.0f} ms')
+    app.close()
@@ -1,34 +1,43 @@
 """
-This is the settings module, it contains all the constants used in the Tetris game
+This is the settings module, it contains all the constants used in the Tetris game.
+Tunables are read from settings.json, the module does not import pygame so the rules can be used without it.
 """
 
-import pygame as pg
+import json
+from os import path
 
+with open(path.join(path.dirname(path.abspath(__file__)), 'settings.json'), 'r', encoding='utf-8') as f:
+    TUNABLES = json.load(f)
 
 # game size
-COLUMNS, ROWS = 10, 20
-CELL = 45
+COLUMNS, ROWS = TUNABLES['columns'], TUNABLES['rows']
+CELL = TUNABLES['cell']
 GAME_W, GAME_H = COLUMNS * CELL, ROWS * CELL
 
 # sidebar size
-SIDEBAR_W = 200
+SIDEBAR_W = TUNABLES['sidebar_width']
 PREVIEW_H = 0.6
 SCORE_H = 0.4
 
 # window
-PADDING = 10
+PADDING = TUNABLES['padding']
 WINDOW_W = GAME_W + SIDEBAR_W * 2 + PADDING * 4
 WINDOW_H = GAME_H + PADDING * 2
 
 # points for clearing lines
-SCORE_POINTS = {1: 100, 2: 300, 3: 500, 4: 800}
+SCORE_POINTS = {int(lines): points for lines, points in TUNABLES['score_points'].items()}
 
 # game behaviour
-TETROMINO_OFFSET_L = pg.Vector2(COLUMNS // 2, 0)  # center tetrominos to the right
-TETROMINO_OFFSET_R = pg.Vector2(COLUMNS // 2 - 1, 0)  # center tetrominos to the left
-MOVE_DOWN_SPEED = 500
-SIDE_MOVE_DELAY = 120
-ROTATE_DELAY = 200
+# spawn offsets from the middle column of the board
+TETROMINO_OFFSET_L = (0, 0)  # center tetrominos to the right
+TETROMINO_OFFSET_R = (-1, 0)  # center tetrominos to the left
+MOVE_DOWN_SPEED = TUNABLES['move_down_speed']
+SIDE_MOVE_DELAY = TUNABLES['side_move_delay']
+ROTATE_DELAY = TUNABLES['rotate_delay']
+
+# keys, the SDL key codes of the pygame key constants
+K_LEFT, K_RIGHT, K_UP, K_DOWN = 1073741904, 1073741903, 1073741906, 1073741905
+K_SPACE, K_ESCAPE, K_BACKSPACE = 32, 27, 8
 
 # colours
 YELLOW = '#f1c00d'